@@ -6,13 +6,18 @@ bl_info = {
     "name": "Align Tools (Advanced)",
     "author": "gabhead, Lell, Anfeo, updated by ChatGPT",
     "version": (1, 2, 0),
-    "blender": (2, 80, 0),
+    "blender": (3, 2, 0),
     "location": "View3D > Sidebar > Align Tools",
     "description": "Advanced alignment tools for objects, origins and cursor",
     "category": "Object",
 }
 
-import bpy
+import atexit
+import importlib
+import sys
+import time
+
+from .host import bpy
 from bpy.types import (
     Operator,
     Panel,
@@ -21,495 +26,238 @@ from bpy.types import (
 from bpy.props import (
     EnumProperty,
     BoolProperty,
+    FloatProperty,
     FloatVectorProperty,
+    IntProperty,
     StringProperty,
 )
-from mathutils import Vector
+from bpy.app.handlers import persistent
 
 
 # ------------------------------------------------------------------------
-# Simple Align Defs
+# Lazy Engine
 # ------------------------------------------------------------------------
 
-def LocAll(context):
-    act = context.active_object
-    if act is None:
-        return
-    for obj in context.selected_objects:
-        obj.matrix_world.translation = act.matrix_world.translation.copy()
-        obj.rotation_euler = act.rotation_euler.copy()
+# Os módulos de engine (numpy, caches, bake) só são importados no primeiro
+# uso; o registro fica restrito às classes de operador e painel.
+_ENGINE_ATTRS = {
+    "get_reference_points": "bounds",
+    "get_sel_ref": "bounds",
+    "point_in_selection": "bounds",
+    "hull_candidates": "bounds",
+    "content_hash": "bounds",
+    "geometry_hash": "bounds",
+    "bounds_cache": "bounds",
+    "library_store": "diskcache",
+    "AlignSettings": "core",
+    "AlignResult": "core",
+    "align_objects": "core",
+    "align_function": "core",
+    "shift_geometry": "core",
+    "group_targets": "groups",
+    "align_groups": "groups",
+    "AlignBake": "bake",
+    "bake_alignment": "bake",
+    "AlignJob": "jobs",
+    "arrange_grid": "layout",
+    "shelf_pack": "layout",
+    "stack_objects": "layout",
+    "selection_extents": "extents",
+    "LocAll": "simple",
+    "LocX": "simple",
+    "LocY": "simple",
+    "LocZ": "simple",
+    "RotAll": "simple",
+    "RotX": "simple",
+    "RotY": "simple",
+    "RotZ": "simple",
+    "ScaleAll": "simple",
+    "ScaleX": "simple",
+    "ScaleY": "simple",
+    "ScaleZ": "simple",
+}
 
+REGISTER_TIME_BUDGET = 0.05  # segundos
+register_time = 0.0
 
-def LocX(context):
-    act = context.active_object
-    if act is None:
-        return
-    for obj in context.selected_objects:
-        obj.matrix_world.translation.x = act.matrix_world.translation.x
 
+def __getattr__(name):
+    module = _ENGINE_ATTRS.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    return getattr(importlib.import_module("." + module, __name__), name)
 
-def LocY(context):
-    act = context.active_object
-    if act is None:
-        return
-    for obj in context.selected_objects:
-        obj.matrix_world.translation.y = act.matrix_world.translation.y
 
+def _loaded_engine(module):
+    """Submódulo de engine se já importado, sem forçar o import"""
+    return sys.modules.get(__name__ + "." + module)
 
-def LocZ(context):
-    act = context.active_object
-    if act is None:
-        return
-    for obj in context.selected_objects:
-        obj.matrix_world.translation.z = act.matrix_world.translation.z
 
+# ------------------------------------------------------------------------
+# Handlers
+# ------------------------------------------------------------------------
 
-def RotAll(context):
-    act = context.active_object
-    if act is None:
+def _tag_view3d_redraw():
+    wm = getattr(bpy.context, "window_manager", None)
+    if wm is None:
         return
-    for obj in context.selected_objects:
-        obj.rotation_euler = act.rotation_euler.copy()
-
+    for window in wm.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
 
-def RotX(context):
-    act = context.active_object
-    if act is None:
-        return
-    for obj in context.selected_objects:
-        obj.rotation_euler.x = act.rotation_euler.x
 
+def _refresh_extents_timer():
+    from .extents import selection_extents
 
-def RotY(context):
-    act = context.active_object
-    if act is None:
-        return
-    for obj in context.selected_objects:
-        obj.rotation_euler.y = act.rotation_euler.y
+    settle_bounds_reset(False)
+    view_layer = getattr(bpy.context, "view_layer", None)
+    if view_layer is not None and selection_extents.update(view_layer):
+        _tag_view3d_redraw()
+    return None
 
 
-def RotZ(context):
-    act = context.active_object
-    if act is None:
-        return
-    for obj in context.selected_objects:
-        obj.rotation_euler.z = act.rotation_euler.z
+def request_extents_refresh():
+    """Agenda a releitura completa fora do draw (ex.: cache recém limpo)"""
+    if not bpy.app.timers.is_registered(_refresh_extents_timer):
+        bpy.app.timers.register(_refresh_extents_timer, first_interval=0.0)
 
 
-def ScaleAll(context):
-    act = context.active_object
-    if act is None:
-        return
-    for obj in context.selected_objects:
-        obj.scale = act.scale.copy()
+# Segundos sem mexer no painel de redo antes do passo com bounds exatos
+REFINE_DELAY = 0.3
 
+_refining = False
+# A próxima atualização do depsgraph é a escrita do próprio Align
+_refine_own_update = False
 
-def ScaleX(context):
-    act = context.active_object
-    if act is None:
-        return
-    for obj in context.selected_objects:
-        obj.scale.x = act.scale.x
 
+def _refine_last_alignment():
+    """Refaz o último Align com bounds exatos, no mesmo passo de undo"""
+    global _refining
+    wm = getattr(bpy.context, "window_manager", None)
+    if wm is None or not wm.windows or not wm.operators:
+        return None
+    if wm.operators[-1].bl_idname != "OBJECT_OT_align_tools":
+        return None  # outro operador já rodou depois
 
-def ScaleY(context):
-    act = context.active_object
-    if act is None:
+    window = bpy.context.window or wm.windows[0]
+    _refining = True
+    try:
+        with bpy.context.temp_override(window=window, screen=window.screen):
+            bpy.ops.ed.undo_redo()
+    except RuntimeError as ex:
+        print("Align Tools: could not refine the alignment:", ex)
+    finally:
+        _refining = False
+    return None
+
+
+def request_exact_refine():
+    """(Re)agenda o passo exato para quando o painel de redo ficar parado"""
+    global _refine_own_update
+    if bpy.app.timers.is_registered(_refine_last_alignment):
+        bpy.app.timers.unregister(_refine_last_alignment)
+    bpy.app.timers.register(_refine_last_alignment, first_interval=REFINE_DELAY)
+    _refine_own_update = True
+
+
+def cancel_exact_refine():
+    """Desiste do passo exato: a cena mudou por fora (edição, undo, redo).
+
+    O ``undo_redo`` do timer refaria o passo do topo da pilha, que já não
+    seria o Align, descartando a mudança do usuário.
+    """
+    global _refine_own_update
+    _refine_own_update = False
+    if bpy.app.timers.is_registered(_refine_last_alignment):
+        bpy.app.timers.unregister(_refine_last_alignment)
+
+
+@persistent
+def bounds_depsgraph_update(scene, depsgraph=None):
+    global _refine_own_update
+    if _refine_own_update:
+        _refine_own_update = False
+    elif not _refining:
+        cancel_exact_refine()
+
+    # Enquanto o engine não foi carregado não há cache para manter
+    bounds = _loaded_engine("bounds")
+    if bounds is None:
         return
-    for obj in context.selected_objects:
-        obj.scale.y = act.scale.y
-
-
-def ScaleZ(context):
-    act = context.active_object
-    if act is None:
+    if _reset_pending:
+        # O undo não era do painel de redo: a cena pode ter voltado a qualquer estado
+        _clear_bounds()
+    extents = _loaded_engine("extents")
+    if extents is not None:
+        view_layer = depsgraph.view_layer if depsgraph is not None else bpy.context.view_layer
+        extents.depsgraph_update(view_layer, depsgraph)
+    elif depsgraph is None:
+        bounds.bounds_cache.clear()
+    else:
+        # Painel nunca desenhado: só a invalidação, sem extents da seleção
+        bounds.bounds_cache.apply_updates(depsgraph.updates)
+
+
+@persistent
+def library_bounds_flush(*args):
+    # Resumos de bibliotecas calculados nesta sessão vão para o disco
+    diskcache = _loaded_engine("diskcache")
+    if diskcache is not None:
+        diskcache.library_store.flush()
+
+
+# undo_post também roda a cada tweak do painel de redo, que desfaz o Align e o
+# reexecuta em seguida. A limpeza do cache fica pendente até o próximo uso:
+# descartada se for esse reexecute, feita em qualquer outro caso.
+_reset_pending = False
+
+
+def _clear_bounds():
+    global _reset_pending
+    _reset_pending = False
+    bounds = _loaded_engine("bounds")
+    if bounds is not None:
+        bounds.bounds_cache.clear()
+
+
+def settle_bounds_reset(repeat):
+    """Resolve a limpeza pendente antes de ler bounds (``repeat`` = reexecute do
+    painel de redo, cujo undo só desfez o próprio Align)"""
+    global _reset_pending
+    if not _reset_pending:
         return
-    for obj in context.selected_objects:
-        obj.scale.z = act.scale.z
+    if repeat:
+        # Transformações são revalidadas pela matriz, geometria pelo hash
+        _reset_pending = False
+    else:
+        _clear_bounds()
 
 
-# ------------------------------------------------------------------------
-# Advanced Align Core
-# ------------------------------------------------------------------------
+def _reset_caches(clear_bounds):
+    global _reset_pending
+    # O painel de redo também desfaz antes de reexecutar; o execute reagenda
+    if not _refining:
+        cancel_exact_refine()
+    if clear_bounds:
+        _clear_bounds()
+    else:
+        _reset_pending = True
+    library_bounds_flush()
+    extents = _loaded_engine("extents")
+    if extents is not None:
+        extents.selection_extents.clear()
 
-def align_function(context,
-                   subject, active_too, consistent, self_or_active,
-                   loc_x, loc_y, loc_z, ref1, ref2, loc_offset,
-                   rot_x, rot_y, rot_z, rot_offset, apply_rot,
-                   scale_x, scale_y, scale_z, scale_offset, apply_scale,
-                   fit_x, fit_y, fit_z, apply_dim):
 
-    sel_obj = context.selected_objects
-    act_obj = context.active_object
+@persistent
+def bounds_reset(*args):
+    # Arquivo carregado ou redo: nada do cache vale mais
+    _reset_caches(True)
 
-    if act_obj is None or not sel_obj:
-        return
-
-    # Respeita os toggles "Apply"
-    if not apply_rot:
-        rot_x = rot_y = rot_z = False
-    if not apply_scale:
-        scale_x = scale_y = scale_z = False
-    if not apply_dim:
-        fit_x = fit_y = fit_z = False
-
-    # ---------------- Helpers ---------------- #
-
-    def get_reference_points(obj, space):
-        """Retorna [minX, centerX, maxX, minY, centerY, maxY, minZ, centerZ, maxZ]"""
-        me = getattr(obj, "data", None)
-        co_list = []
-        ok = False
-
-        if space == "global":
-            obj_mtx = obj.matrix_world
-            if obj.type == 'MESH' and me and len(me.vertices) > 0:
-                ok = True
-                for p in me.vertices:
-                    co_list.append(obj_mtx @ p.co)
-
-            elif obj.type in {'CURVE', 'SURFACE', 'FONT'} and me and len(getattr(me, "splines", [])) > 0:
-                ok = True
-                for s in me.splines:
-                    if getattr(s, "bezier_points", None):
-                        for p in s.bezier_points:
-                            co_list.append(obj_mtx @ p.co)
-                    if getattr(s, "points", None):
-                        for p in s.points:
-                            co_list.append(obj_mtx @ p.co)
-
-        elif space == "local":
-            if obj.type == 'MESH' and me and len(me.vertices) > 0:
-                ok = True
-                for p in me.vertices:
-                    co_list.append(p.co)
-
-            elif obj.type in {'CURVE', 'SURFACE', 'FONT'} and me and len(getattr(me, "splines", [])) > 0:
-                ok = True
-                for s in me.splines:
-                    if getattr(s, "bezier_points", None):
-                        for p in s.bezier_points:
-                            co_list.append(p.co)
-                    if getattr(s, "points", None):
-                        for p in s.points:
-                            co_list.append(p.co)
-
-        if ok and co_list:
-            max_x = min_x = co_list[0].x
-            max_y = min_y = co_list[0].y
-            max_z = min_z = co_list[0].z
-
-            for v in co_list:
-                x, y, z = v.x, v.y, v.z
-                if x > max_x:
-                    max_x = x
-                if x < min_x:
-                    min_x = x
-                if y > max_y:
-                    max_y = y
-                if y < min_y:
-                    min_y = y
-                if z > max_z:
-                    max_z = z
-                if z < min_z:
-                    min_z = z
-        else:
-            a = obj.matrix_world.translation
-            min_x = max_x = a.x
-            min_y = max_y = a.y
-            min_z = max_z = a.z
-
-        center_x = (min_x + max_x) * 0.5
-        center_y = (min_y + max_y) * 0.5
-        center_z = (min_z + max_z) * 0.5
-
-        return [
-            min_x, center_x, max_x,
-            min_y, center_y, max_y,
-            min_z, center_z, max_z,
-        ]
-
-    def get_sel_ref(ref_co, objects):
-        """Min e max da seleção em torno de um ponto interno"""
-        max_x = ref_co.x
-        min_x = ref_co.x
-        max_y = ref_co.y
-        min_y = ref_co.y
-        max_z = ref_co.z
-        min_z = ref_co.z
-
-        for obj in objects:
-            ref_points = get_reference_points(obj, "global")
-            if ref_co.x < ref_points[0]:
-                min_x = ref_points[0]
-            if ref_co.x > ref_points[2]:
-                max_x = ref_points[2]
-            if ref_co.y < ref_points[3]:
-                min_y = ref_points[3]
-            if ref_co.y > ref_points[5]:
-                max_y = ref_points[5]
-            if ref_co.z < ref_points[6]:
-                min_z = ref_points[6]
-            if ref_co.z > ref_points[8]:
-                max_z = ref_points[8]
-
-        sel_min = Vector((min_x, min_y, min_z))
-        sel_max = Vector((max_x, max_y, max_z))
-        return sel_min, sel_max
-
-    def find_ref2_co(target_obj):
-        """Coordenada de destino (Min/Center/Pivot/Max/Cursor) do ativo"""
-        if ref2 == "4":
-            return context.scene.cursor.location.copy()
-
-        ref_points = get_reference_points(target_obj, "global")
-
-        if ref2 == "0":  # Min
-            return Vector((ref_points[0], ref_points[3], ref_points[6]))
-        elif ref2 == "1":  # Center
-            return Vector((ref_points[1], ref_points[4], ref_points[7]))
-        elif ref2 == "2":  # Pivot
-            return target_obj.matrix_world.translation.copy()
-        elif ref2 == "3":  # Max
-            return Vector((ref_points[2], ref_points[5], ref_points[8]))
-        else:
-            return target_obj.matrix_world.translation.copy()
-
-    def point_in_selection(active, objects):
-        """Pega um ponto qualquer dentro da seleção (primeiro vértice/point que achar)"""
-        ref_ob = None
-        ref_co = None
-
-        for o in objects:
-            if o == active:
-                continue
-            ref_ob = o
-            obj_mtx = o.matrix_world
-            me = getattr(o, "data", None)
-
-            if o.type == 'MESH' and me and len(me.vertices) > 0:
-                ref_co = obj_mtx @ me.vertices[0].co
-                break
-            elif o.type in {'CURVE', 'SURFACE', 'FONT'} and me and len(getattr(me, "splines", [])) > 0:
-                for s in me.splines:
-                    if getattr(s, "bezier_points", None):
-                        ref_co = obj_mtx @ s.bezier_points[0].co
-                        break
-                    if getattr(s, "points", None):
-                        ref_co = obj_mtx @ s.points[0].co
-                        break
-                if ref_co is not None:
-                    break
-
-        if ref_co is None:
-            if ref_ob is not None:
-                ref_co = ref_ob.matrix_world.translation.copy()
-            else:
-                ref_co = active.matrix_world.translation.copy()
-
-        return ref_co
-
-    def find_new_rotation(obj):
-        if rot_x:
-            obj.rotation_euler.x = act_obj.rotation_euler.x + rot_offset[0]
-        if rot_y:
-            obj.rotation_euler.y = act_obj.rotation_euler.y + rot_offset[1]
-        if rot_z:
-            obj.rotation_euler.z = act_obj.rotation_euler.z + rot_offset[2]
-
-    def find_new_scale(obj):
-        if scale_x:
-            obj.scale.x = act_obj.scale.x + scale_offset[0]
-        if scale_y:
-            obj.scale.y = act_obj.scale.y + scale_offset[1]
-        if scale_z:
-            obj.scale.z = act_obj.scale.z + scale_offset[2]
-
-    def find_new_dimensions(obj, ref_dim):
-        """Ref_dim = dimensão alvo (Vector) do ativo"""
-        ref_points = get_reference_points(obj, "local")
-        dim = Vector((
-            ref_points[2] - ref_points[0],
-            ref_points[5] - ref_points[3],
-            ref_points[8] - ref_points[6],
-        ))
-
-        ratio_x = dim.x / ref_dim.x if ref_dim.x != 0 else 1.0
-        ratio_y = dim.y / ref_dim.y if ref_dim.y != 0 else 1.0
-        ratio_z = dim.z / ref_dim.z if ref_dim.z != 0 else 1.0
-
-        dx = Vector((0.0, 0.0, 0.0))
-        dy = Vector((0.0, 0.0, 0.0))
-        dz = Vector((0.0, 0.0, 0.0))
-
-        if fit_x and ratio_x != 0:
-            dx = ((1.0 - ratio_x) * 0.5) * dim
-        if fit_y and ratio_y != 0:
-            dy = ((1.0 - ratio_y) * 0.5) * dim
-        if fit_z and ratio_z != 0:
-            dz = ((1.0 - ratio_z) * 0.5) * dim
-
-        obj.location += dx + dy + dz
-
-        if fit_x and ratio_x != 0:
-            obj.scale.x *= 1.0 / ratio_x
-        if fit_y and ratio_y != 0:
-            obj.scale.y *= 1.0 / ratio_y
-        if fit_z and ratio_z != 0:
-            obj.scale.z *= 1.0 / ratio_z
-
-    def find_new_coord(obj, ref2_co):
-        """Alinha o objeto ao ref2_co, usando Min/Center/Pivot/Max + offset"""
-        ref_points = get_reference_points(obj, "global")
-        obj_min = Vector((ref_points[0], ref_points[3], ref_points[6]))
-        obj_max = Vector((ref_points[2], ref_points[5], ref_points[8]))
-        obj_center = (obj_min + obj_max) * 0.5
-        obj_pivot = obj.matrix_world.translation.copy()
-
-        if ref1 == "0":
-            source = obj_min + loc_offset
-        elif ref1 == "1":
-            source = obj_center + loc_offset
-        elif ref1 == "2":
-            source = obj_pivot + loc_offset
-        elif ref1 == "3":
-            source = obj_max + loc_offset
-        else:
-            source = obj_pivot + loc_offset
-
-        translate = ref2_co - source
-
-        if loc_x:
-            obj.location.x += translate.x
-        if loc_y:
-            obj.location.y += translate.y
-        if loc_z:
-            obj.location.z += translate.z
-
-    # ---------------- Lógica principal ---------------- #
-
-    if subject == "0":  # Objects
-        ref2_co = find_ref2_co(act_obj)
-
-        if consistent:
-            # Move a seleção como bloco
-            ref_co = point_in_selection(act_obj, sel_obj)
-            sel_min, sel_max = get_sel_ref(ref_co, sel_obj)
-            sel_center = sel_min + (sel_max - sel_min) * 0.5
-
-            if ref1 == "0":
-                translate = ref2_co - (sel_min + loc_offset)
-            elif ref1 == "1":
-                translate = ref2_co - (sel_center + loc_offset)
-            elif ref1 == "3":
-                translate = ref2_co - (sel_max + loc_offset)
-            else:
-                translate = ref2_co - (sel_center + loc_offset)
-
-            for obj in sel_obj:
-                if obj != act_obj or (active_too and obj == act_obj):
-                    if loc_x:
-                        obj.location.x += translate.x
-                    if loc_y:
-                        obj.location.y += translate.y
-                    if loc_z:
-                        obj.location.z += translate.z
 
-        else:
-            # Trata objeto a objeto
-            for obj in sel_obj:
-                if obj == act_obj:
-                    continue
-
-                if rot_x or rot_y or rot_z:
-                    find_new_rotation(obj)
-
-                if fit_x or fit_y or fit_z:
-                    ref_points = get_reference_points(act_obj, "local")
-                    dim = Vector((
-                        ref_points[2] - ref_points[0],
-                        ref_points[5] - ref_points[3],
-                        ref_points[8] - ref_points[6],
-                    ))
-                    find_new_dimensions(obj, dim)
-
-                if scale_x or scale_y or scale_z:
-                    find_new_scale(obj)
-
-                if loc_x or loc_y or loc_z:
-                    find_new_coord(obj, ref2_co)
-
-            if active_too:
-                if rot_x or rot_y or rot_z:
-                    find_new_rotation(act_obj)
-
-                if fit_x or fit_y or fit_z:
-                    ref_points = get_reference_points(act_obj, "local")
-                    dim = Vector((
-                        ref_points[2] - ref_points[0],
-                        ref_points[5] - ref_points[3],
-                        ref_points[8] - ref_points[6],
-                    ))
-                    find_new_dimensions(act_obj, dim)
-
-                if scale_x or scale_y or scale_z:
-                    find_new_scale(act_obj)
-
-                if loc_x or loc_y or loc_z:
-                    find_new_coord(act_obj, ref2_co)
-
-    elif subject == "1":  # "Pivot" – aqui estou interpretando como alinhar a origem (location)
-        ref2_co = find_ref2_co(act_obj)
-
-        for obj in sel_obj:
-            if obj != act_obj or active_too:
-                if loc_x:
-                    obj.location.x = ref2_co.x
-                if loc_y:
-                    obj.location.y = ref2_co.y
-                if loc_z:
-                    obj.location.z = ref2_co.z
-
-    elif subject == "2":  # Cursor
-        cur = context.scene.cursor.location
-
-        def set_cursor_from_vector(target_co):
-            if loc_x:
-                cur.x = target_co.x + loc_offset[0]
-            if loc_y:
-                cur.y = target_co.y + loc_offset[1]
-            if loc_z:
-                cur.z = target_co.z + loc_offset[2]
-
-        if self_or_active in {"0", "1"}:  # Cursor em relação ao ativo
-            ref_points = get_reference_points(act_obj, "global")
-            ref_min = Vector((ref_points[0], ref_points[3], ref_points[6]))
-            ref_max = Vector((ref_points[2], ref_points[5], ref_points[8]))
-            ref_center = (ref_min + ref_max) * 0.5
-            ref_pivot = act_obj.matrix_world.translation.copy()
-
-            if ref2 == "0":  # Min
-                set_cursor_from_vector(ref_min)
-            elif ref2 == "1":  # Center
-                set_cursor_from_vector(ref_center)
-            elif ref2 == "2":  # Pivot
-                set_cursor_from_vector(ref_pivot)
-            elif ref2 == "3":  # Max
-                set_cursor_from_vector(ref_max)
-
-        elif self_or_active == "2":  # Cursor em relação à seleção inteira
-            ref_co = point_in_selection(act_obj, sel_obj)
-            sel_min, sel_max = get_sel_ref(ref_co, sel_obj)
-            sel_center = sel_min + (sel_max - sel_min) * 0.5
-
-            if ref2 == "0":  # Min
-                set_cursor_from_vector(sel_min)
-            elif ref2 == "1":  # Center
-                set_cursor_from_vector(sel_center)
-            elif ref2 == "2":  # Pivot (usa o centro da seleção)
-                set_cursor_from_vector(sel_center)
-            elif ref2 == "3":  # Max
-                set_cursor_from_vector(sel_max)
+@persistent
+def bounds_undo(*args):
+    _reset_caches(False)
 
 
 # ------------------------------------------------------------------------
@@ -542,6 +290,23 @@ class AlignAddonPreferences(AddonPreferences):
         update=update_panel,
     )
 
+    background_threshold: IntProperty(
+        name="Background Threshold",
+        description="Selections with at least this many objects are aligned in "
+                    "time-sliced chunks with progress (Esc cancels)",
+        default=10000,
+        min=0,
+    )
+
+    latency_budget: FloatProperty(
+        name="Redo Latency Budget (ms)",
+        description="Redo panel tweaks whose exact bounds would take longer than this "
+                    "use approximate boxes, refined to exact bounds once tweaking stops "
+                    "(0 always uses exact bounds)",
+        default=50.0,
+        min=0.0,
+    )
+
     def draw(self, context):
         layout = self.layout
         split = layout.split(factor=0.15)
@@ -550,6 +315,9 @@ class AlignAddonPreferences(AddonPreferences):
         col = split.column()
         col.prop(self, "category", text="")
 
+        layout.prop(self, "background_threshold")
+        layout.prop(self, "latency_budget")
+
 
 # ------------------------------------------------------------------------
 # Advanced Align Operator
@@ -561,9 +329,12 @@ class OBJECT_OT_align_tools(Operator):
     bl_description = "Align Object Tools"
     bl_options = {'REGISTER', 'UNDO', 'PRESET'}
 
+    _timer = None
+    _job = None
+
     subject: EnumProperty(
         items=(("0", "Object", "Align Objects"),
-               ("1", "Pivot", "Align Objects Pivot"),
+               ("1", "Pivot", "Move the objects origin, keeping their geometry in place"),
                ("2", "Cursor", "Align Cursor To Active")),
         name="Align To",
         description="What will be moved"
@@ -720,6 +491,95 @@ class OBJECT_OT_align_tools(Operator):
         description="Enable Scale alignment"
     )
 
+    snap: BoolProperty(
+        name="Snap",
+        default=False,
+        description="Snap the resulting transforms to a grid"
+    )
+    snap_location: FloatProperty(
+        name="Grid Size",
+        default=0.1,
+        min=0.0,
+        subtype='DISTANCE',
+        description="Location grid size (0 to disable)"
+    )
+    snap_reference: EnumProperty(
+        items=(("2", "Pivot", "Snap the object pivot"),
+               ("0", "Min", "Snap the minimum point"),
+               ("1", "Center", "Snap the center point"),
+               ("3", "Max", "Snap the maximum point")),
+        name="Snap reference",
+        description="Point of each object that lands on the grid"
+    )
+    snap_rotation: FloatProperty(
+        name="Angle Increment",
+        default=0.0,
+        min=0.0,
+        subtype='ANGLE',
+        description="Rotation increment (0 to disable)"
+    )
+    snap_scale: FloatProperty(
+        name="Scale Step",
+        default=0.0,
+        min=0.0,
+        description="Scale increment (0 to disable)"
+    )
+
+    group_by: EnumProperty(
+        items=(("NONE", "None", "Align the whole selection to the active object"),
+               ("COLLECTION", "Collection", "Align the objects of each collection to its target"),
+               ("PARENT", "Parent", "Align the selected children of each object to their parent"),
+               ("NAME", "Name", "Align objects sharing a name key to their target")),
+        name="Groups",
+        default="NONE",
+        description="Pair the selected objects with one target per group"
+    )
+    group_target_pattern: StringProperty(
+        name="Target",
+        default="*_target",
+        description="Wildcard pattern matching the target of each group "
+                    "(the active object is used when none matches)"
+    )
+    group_key_pattern: StringProperty(
+        name="Key",
+        default=r"^(.*?)(?:_target)?(?:\.\d+)?$",
+        description="Regular expression whose first group is the name key"
+    )
+
+    approximate: BoolProperty(
+        name="Approximate",
+        default=False,
+        options={'HIDDEN', 'SKIP_SAVE'},
+        description="Last run used approximate bounds to stay within the latency budget"
+    )
+
+    bake: BoolProperty(
+        name="Bake",
+        default=False,
+        description="Align on every frame of a range and insert keyframes"
+    )
+    bake_scene_range: BoolProperty(
+        name="Scene Range",
+        default=True,
+        description="Bake over the scene frame range"
+    )
+    bake_start: IntProperty(
+        name="Start",
+        default=1,
+        description="First frame to bake"
+    )
+    bake_end: IntProperty(
+        name="End",
+        default=250,
+        description="Last frame to bake"
+    )
+    bake_step: IntProperty(
+        name="Step",
+        default=1,
+        min=1,
+        description="Frame step between baked keyframes"
+    )
+
     def draw(self, context):
         layout = self.layout
         obj = context.object
@@ -797,18 +657,180 @@ class OBJECT_OT_align_tools(Operator):
         row11.prop(self, 'fit_z', text='Z', toggle=True)
         row11.prop(self, 'apply_dim', text='Apply', toggle=True)
 
-    def execute(self, context):
-        align_function(
-            context,
-            self.subject, self.active_too, self.consistent,
-            self.self_or_active, self.loc_x, self.loc_y, self.loc_z,
-            self.ref1, self.ref2, self.loc_offset,
-            self.rot_x, self.rot_y, self.rot_z, self.rot_offset, self.apply_rot,
-            self.scale_x, self.scale_y, self.scale_z, self.scale_offset, self.apply_scale,
-            self.fit_x, self.fit_y, self.fit_z, self.apply_dim
+        row18 = layout.row()
+        row18.label(text='Snap:')
+        row18.prop(self, 'snap', text='Apply', toggle=True)
+        if self.snap:
+            col2 = layout.column(align=True)
+            col2.prop(self, 'snap_location')
+            if self.subject == "0":
+                col2.prop(self, 'snap_reference', text='Reference')
+                col2.prop(self, 'snap_rotation')
+                col2.prop(self, 'snap_scale')
+
+        if self.subject != "2":
+            row19 = layout.row(align=True)
+            row19.prop(self, 'group_by')
+            if self.group_by in {'COLLECTION', 'NAME'}:
+                col3 = layout.column(align=True)
+                col3.prop(self, 'group_target_pattern')
+                if self.group_by == 'NAME':
+                    col3.prop(self, 'group_key_pattern')
+
+        if self.subject == "0" and self.group_by == 'NONE':
+            row16 = layout.row(align=True)
+            row16.prop(self, 'bake', toggle=True)
+            if self.bake:
+                row16.prop(self, 'bake_scene_range', toggle=True)
+                row17 = layout.row(align=True)
+                if not self.bake_scene_range:
+                    row17.prop(self, 'bake_start')
+                    row17.prop(self, 'bake_end')
+                row17.prop(self, 'bake_step')
+
+        if self.approximate:
+            layout.label(text="Approximate bounds while tweaking", icon='INFO')
+
+    def invoke(self, context, event):
+        settle_bounds_reset(False)
+        prefs = context.preferences.addons[__name__].preferences
+        if (self.bake or self.group_by != 'NONE'
+                or len(context.selected_objects) < prefs.background_threshold):
+            return self.execute(context)
+
+        from .core import AlignSettings
+        from .jobs import AlignJob
+
+        self._job = AlignJob(
+            context.selected_objects,
+            context.active_object,
+            AlignSettings.from_operator(self),
+            context.scene.cursor.location,
         )
+        wm = context.window_manager
+        wm.progress_begin(0, 100)
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        context.workspace.status_text_set("Aligning... Esc to cancel")
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self._job.rollback()
+            self._finish(context)
+            return {'CANCELLED'}
+
+        if event.type == 'TIMER':
+            done = self._job.step()
+            context.window_manager.progress_update(int(self._job.progress * 100))
+            if done:
+                self._report_skipped(self._job.result)
+                self._finish(context)
+                return {'FINISHED'}
+
+        if event.type in {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE', 'TRACKPADPAN', 'TRACKPADZOOM'}:
+            return {'PASS_THROUGH'}
+        return {'RUNNING_MODAL'}
+
+    def _finish(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        self._timer = None
+        self._job = None
+
+    def execute(self, context):
+        from .core import AlignSettings
+
+        settle_bounds_reset(_refining or self.is_repeat())
+        settings = AlignSettings.from_operator(self)
+
+        if self.bake and self.subject == "0" and self.group_by == 'NONE':
+            if context.active_object is None:
+                self.report({'ERROR'}, "Bake needs an active object")
+                return {'CANCELLED'}
+            scene = context.scene
+            start, end = self.bake_start, self.bake_end
+            if self.bake_scene_range:
+                start, end = scene.frame_start, scene.frame_end
+            from .bake import bake_alignment
+
+            try:
+                bake_alignment(context.selected_objects, context.active_object,
+                               settings, start, end, self.bake_step,
+                               cursor=context.scene.cursor.location)
+            except ValueError as e:
+                self.report({'ERROR'}, str(e))
+                return {'CANCELLED'}
+            return {'FINISHED'}
+
+        from .bounds import bounds_cache
+
+        # Tweaks caros no painel de redo usam caixas; o passo exato vem depois
+        self.approximate = self._over_latency_budget(context)
+        with bounds_cache.approximated(self.approximate):
+            status = self._align(context, settings)
+        if self.approximate:
+            request_exact_refine()
+        return status
+
+    def _over_latency_budget(self, context):
+        if _refining or not self.is_repeat():
+            return False
+        prefs = context.preferences.addons[__name__].preferences
+        if prefs.latency_budget <= 0.0:
+            return False
+        from .bounds import bounds_cache
+
+        objects = list(context.selected_objects)
+        if context.active_object is not None:
+            objects.append(context.active_object)
+        return bounds_cache.estimate_seconds(objects) * 1000.0 > prefs.latency_budget
+
+    def _align(self, context, settings):
+        from .core import align_objects
+
+        if self.group_by != 'NONE' and self.subject != "2":
+            import re
+            from .groups import align_groups, group_targets
+
+            try:
+                groups = group_targets(
+                    context.selected_objects, self.group_by,
+                    self.group_target_pattern, self.group_key_pattern,
+                    context.active_object,
+                )
+            except re.error as e:
+                self.report({'ERROR'}, "Invalid key pattern: {}".format(e))
+                return {'CANCELLED'}
+            if not groups:
+                self.report({'WARNING'}, "No group with a target was found")
+                return {'CANCELLED'}
+            try:
+                result = align_groups(groups, settings, context.scene.cursor.location)
+            except ValueError as e:
+                self.report({'ERROR'}, str(e))
+                return {'CANCELLED'}
+        else:
+            result = align_objects(
+                context.selected_objects,
+                context.active_object,
+                settings,
+                context.scene.cursor.location,
+            )
+        self._report_skipped(result)
         return {'FINISHED'}
 
+    def _report_skipped(self, result):
+        if result is None or not result.skipped:
+            return
+        names = ", ".join(obj.name for obj in result.skipped[:3])
+        if len(result.skipped) > 3:
+            names += ", ..."
+        self.report({'WARNING'}, "Origin kept on {} object(s) whose geometry cannot be moved: {}"
+                    .format(len(result.skipped), names))
+
 
 # ------------------------------------------------------------------------
 # Simple Align Operators
@@ -825,6 +847,7 @@ class OBJECT_OT_AlignOperator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import LocAll, RotAll
         LocAll(context)
         RotAll(context)
         return {'FINISHED'}
@@ -841,6 +864,7 @@ class OBJECT_OT_AlignLocationOperator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import LocAll
         LocAll(context)
         return {'FINISHED'}
 
@@ -856,6 +880,7 @@ class OBJECT_OT_AlignLocationXOperator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import LocX
         LocX(context)
         return {'FINISHED'}
 
@@ -871,6 +896,7 @@ class OBJECT_OT_AlignLocationYOperator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import LocY
         LocY(context)
         return {'FINISHED'}
 
@@ -886,6 +912,7 @@ class OBJECT_OT_AlignLocationZOperator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import LocZ
         LocZ(context)
         return {'FINISHED'}
 
@@ -901,6 +928,7 @@ class OBJECT_OT_AlignRotationOperator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import RotAll
         RotAll(context)
         return {'FINISHED'}
 
@@ -916,6 +944,7 @@ class OBJECT_OT_AlignRotationXOperator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import RotX
         RotX(context)
         return {'FINISHED'}
 
@@ -931,6 +960,7 @@ class OBJECT_OT_AlignRotationYOperator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import RotY
         RotY(context)
         return {'FINISHED'}
 
@@ -946,6 +976,7 @@ class OBJECT_OT_AlignRotationZOperator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import RotZ
         RotZ(context)
         return {'FINISHED'}
 
@@ -961,6 +992,7 @@ class OBJECT_OT_AlignObjectsScaleOperator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import ScaleAll
         ScaleAll(context)
         return {'FINISHED'}
 
@@ -976,6 +1008,7 @@ class OBJECT_OT_AlignObjectsScaleXOPerator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import ScaleX
         ScaleX(context)
         return {'FINISHED'}
 
@@ -991,6 +1024,7 @@ class OBJECT_OT_AlignObjectsScaleYOPerator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import ScaleY
         ScaleY(context)
         return {'FINISHED'}
 
@@ -1006,10 +1040,95 @@ class OBJECT_OT_AlignObjectsScaleZOPerator(Operator):
         return context.active_object is not None
 
     def execute(self, context):
+        from .simple import ScaleZ
         ScaleZ(context)
         return {'FINISHED'}
 
 
+# ------------------------------------------------------------------------
+# Layout Operators
+# ------------------------------------------------------------------------
+
+class OBJECT_OT_align_arrange_grid(Operator):
+    bl_idname = "object.align_arrange_grid"
+    bl_label = "Arrange in Grid"
+    bl_description = "Pack the selected objects into shelves on a plane, starting at the 3D cursor"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    plane: EnumProperty(
+        items=(("XY", "XY", "Arrange on the XY plane"),
+               ("XZ", "XZ", "Arrange on the XZ plane"),
+               ("YZ", "YZ", "Arrange on the YZ plane")),
+        name="Plane",
+        description="Plane the objects are laid out on"
+    )
+
+    padding: FloatProperty(
+        name="Padding",
+        default=0.1,
+        min=0.0,
+        subtype='DISTANCE',
+        description="Gap between neighbouring objects"
+    )
+
+    sort_key: EnumProperty(
+        items=(("SIZE", "Size", "Largest objects first"),
+               ("NAME", "Name", "Alphabetical order"),
+               ("TYPE", "Type", "Group by object type, then name")),
+        name="Sort By",
+        description="Order in which objects are placed"
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.selected_objects)
+
+    def execute(self, context):
+        from .layout import arrange_grid
+
+        settle_bounds_reset(self.is_repeat())
+        arrange_grid(context.selected_objects, context.scene.cursor.location,
+                     self.plane, self.padding, self.sort_key)
+        return {'FINISHED'}
+
+
+class OBJECT_OT_align_stack(Operator):
+    bl_idname = "object.align_stack"
+    bl_label = "Stack"
+    bl_description = "Place the selected objects end to end along an axis, starting from the active one"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    axis: EnumProperty(
+        items=(("X", "X", "Stack towards +X"),
+               ("Y", "Y", "Stack towards +Y"),
+               ("Z", "Z", "Stack towards +Z"),
+               ("-X", "-X", "Stack towards -X"),
+               ("-Y", "-Y", "Stack towards -Y"),
+               ("-Z", "-Z", "Stack towards -Z")),
+        name="Axis",
+        default="Z",
+        description="Direction of the stack"
+    )
+
+    gap: FloatProperty(
+        name="Gap",
+        default=0.0,
+        subtype='DISTANCE',
+        description="Distance between consecutive objects"
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return len(context.selected_objects) > 1
+
+    def execute(self, context):
+        from .layout import stack_objects
+
+        settle_bounds_reset(self.is_repeat())
+        stack_objects(context.selected_objects, context.active_object, self.axis, self.gap)
+        return {'FINISHED'}
+
+
 # ------------------------------------------------------------------------
 # Panel
 # ------------------------------------------------------------------------
@@ -1054,6 +1173,29 @@ class VIEW3D_PT_AlignUi(Panel):
         col.operator("object.align_tools", text="Advanced Align")
         col.label(text="Selected to active:")
 
+        col = layout.column(align=True)
+        col.label(text="Layout:")
+        col.operator("object.align_arrange_grid", text="Arrange in Grid")
+        col.operator("object.align_stack", text="Stack")
+
+        # Só lê o cache; a varredura de geometria fica no handler de depsgraph
+        extents = _loaded_engine("extents")
+        extents = extents.selection_extents if extents is not None else None
+        if extents is None or extents.dirty:
+            request_extents_refresh()
+
+        box = layout.box()
+        box.label(text="Extents:")
+        if extents is None:
+            return
+        for label, values in (("Active", extents.active), ("Selection", extents.selection)):
+            if values is None:
+                continue
+            col = box.column(align=True)
+            col.label(text=label + ":")
+            for name, v in zip(("Min", "Center", "Max", "Size"), values):
+                col.label(text="{}: {:.4g}  {:.4g}  {:.4g}".format(name, *v))
+
 
 # ------------------------------------------------------------------------
 # Register
@@ -1075,6 +1217,8 @@ classes = (
     OBJECT_OT_AlignObjectsScaleXOPerator,
     OBJECT_OT_AlignObjectsScaleYOPerator,
     OBJECT_OT_AlignObjectsScaleZOPerator,
+    OBJECT_OT_align_arrange_grid,
+    OBJECT_OT_align_stack,
     VIEW3D_PT_AlignUi,
 )
 
@@ -1084,6 +1228,9 @@ panels = (
 
 
 def register():
+    global register_time
+    start = time.perf_counter()
+
     for cls in classes:
         bpy.utils.register_class(cls)
 
@@ -1097,8 +1244,35 @@ def register():
     for panel in panels:
         panel.bl_category = category
 
+    bpy.app.handlers.depsgraph_update_post.append(bounds_depsgraph_update)
+    bpy.app.handlers.load_post.append(bounds_reset)
+    bpy.app.handlers.undo_post.append(bounds_undo)
+    bpy.app.handlers.redo_post.append(bounds_reset)
+    bpy.app.handlers.save_post.append(library_bounds_flush)
+    # Sessão encerrada sem salvar: os resumos calculados também vão para o disco
+    atexit.register(library_bounds_flush)
+
+    register_time = time.perf_counter() - start
+    if register_time > REGISTER_TIME_BUDGET:
+        print("\n[{}]\n: Registration took {:.1f} ms (budget {:.1f} ms)".format(
+            __name__, register_time * 1000.0, REGISTER_TIME_BUDGET * 1000.0))
+
 
 def unregister():
+    for handlers, handler in (
+        (bpy.app.handlers.depsgraph_update_post, bounds_depsgraph_update),
+        (bpy.app.handlers.load_post, bounds_reset),
+        (bpy.app.handlers.undo_post, bounds_undo),
+        (bpy.app.handlers.redo_post, bounds_reset),
+        (bpy.app.handlers.save_post, library_bounds_flush),
+    ):
+        if handler in handlers:
+            handlers.remove(handler)
+    atexit.unregister(library_bounds_flush)
+    cancel_exact_refine()
+    library_bounds_flush()
+    bounds_reset()
+
     for cls in classes:
         bpy.utils.unregister_class(cls)
 
@@ -0,0 +1,261 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+from dataclasses import dataclass, field
+
+from mathutils import (
+    Euler,
+    Matrix,
+    Quaternion,
+    Vector,
+)
+import numpy as np
+
+from .core import (
+    align_objects,
+    rotation_path,
+    rotation_to_matrix,
+    rotation_values,
+)
+from .host import bpy
+
+
+# ------------------------------------------------------------------------
+# Frame Bake
+# ------------------------------------------------------------------------
+
+class _FrameProxy:
+    """Objeto com a transformação de um frame, avaliada direto das F-Curves.
+
+    Evita ``frame_set``: só as F-Curves dos objetos envolvidos (e de seus pais)
+    são avaliadas. Constraints e drivers não entram no cálculo. Os demais
+    atributos (display do empty, pose, instâncias, modificadores...) vêm do
+    objeto original.
+    """
+
+    def __init__(self, obj, parent=None):
+        self.original = obj
+        self.name = obj.name
+        self.type = obj.type
+        self.data = obj.data
+        self.parent = parent
+        self.rotation_mode = obj.rotation_mode
+
+        self.fcurves = {}
+        anim = obj.animation_data
+        if anim is not None and anim.action is not None:
+            for fc in anim.action.fcurves:
+                self.fcurves[(fc.data_path, fc.array_index)] = fc
+        self.animated = bool(self.fcurves) or (parent is not None and parent.animated)
+
+        self.location = obj.location.copy()
+        self.rotation_euler = obj.rotation_euler.copy()
+        self.rotation_quaternion = obj.rotation_quaternion.copy()
+        self.rotation_axis_angle = tuple(obj.rotation_axis_angle)
+        self.scale = obj.scale.copy()
+        self.matrix_world = obj.matrix_world.copy()
+        self.matrix_parent_inverse = obj.matrix_parent_inverse
+
+    def __getattr__(self, name):
+        if name == "original":
+            raise AttributeError(name)
+        return getattr(self.original, name)
+
+    def _channel(self, data_path, values, frame):
+        values = list(values)
+        for i in range(len(values)):
+            fc = self.fcurves.get((data_path, i))
+            if fc is not None:
+                values[i] = fc.evaluate(frame)
+        return values
+
+    def evaluate(self, frame):
+        if not self.animated:
+            return
+
+        obj = self.original
+        self.location = Vector(self._channel("location", obj.location, frame))
+        self.rotation_euler = Euler(self._channel("rotation_euler", obj.rotation_euler, frame),
+                                    obj.rotation_euler.order)
+        self.scale = Vector(self._channel("scale", obj.scale, frame))
+
+        if self.rotation_mode == 'QUATERNION':
+            self.rotation_quaternion = Quaternion(
+                self._channel("rotation_quaternion", obj.rotation_quaternion, frame))
+        elif self.rotation_mode == 'AXIS_ANGLE':
+            self.rotation_axis_angle = tuple(
+                self._channel("rotation_axis_angle", obj.rotation_axis_angle, frame))
+
+        basis = self.matrix_basis
+        if self.parent is not None:
+            self.matrix_world = self.parent.matrix_world @ self.matrix_parent_inverse @ basis
+        else:
+            self.matrix_world = basis
+
+    @property
+    def matrix_basis(self):
+        rot = rotation_to_matrix(self.rotation_mode, rotation_values(self))
+        return (Matrix.Translation(self.location) @ rot.to_4x4()
+                @ Matrix.Diagonal(self.scale).to_4x4())
+
+
+@dataclass
+class AlignBake:
+    """Alinhamento avaliado por frame: arrays (F, N, 3) na ordem de ``objects``.
+
+    ``rotations`` é (F, N, 4) no ``rotation_mode`` de cada objeto e vira
+    keyframes no canal desse modo. ``axes`` mapeia cada canal aos índices que o
+    alinhamento altera (ver ``baked_axes``); os demais não recebem chaves.
+    """
+    objects: list
+    frames: np.ndarray
+    locations: np.ndarray
+    rotations: np.ndarray
+    scales: np.ndarray
+    axes: dict = field(default_factory=lambda: {
+        "location": (0, 1, 2), "rotation": (0, 1, 2), "scale": (0, 1, 2)})
+
+    def write_keyframes(self):
+        """Grava as F-Curves em bloco (substitui as chaves dentro do intervalo)"""
+        arrays = {
+            "location": self.locations,
+            "rotation": self.rotations,
+            "scale": self.scales,
+        }
+        for j, obj in enumerate(self.objects):
+            anim = obj.animation_data or obj.animation_data_create()
+            if anim.action is None:
+                anim.action = bpy.data.actions.new(obj.name + "Action")
+            for channel, indices in self.axes.items():
+                values = arrays[channel]
+                data_path = channel
+                # Um eixo mundial mexe em todas as componentes locais quando
+                # há pai (espaço do pai) ou a rotação não é euler
+                if channel == "rotation":
+                    data_path = rotation_path(obj.rotation_mode)
+                    if data_path != "rotation_euler" or obj.parent is not None:
+                        indices = range(3 if data_path == "rotation_euler" else 4)
+                elif channel == "location" and obj.parent is not None:
+                    indices = range(3)
+                for i in indices:
+                    insert_keyframes(anim.action, data_path, i, self.frames, values[:, j, i])
+
+
+def baked_axes(settings):
+    """Canal -> índices que o alinhamento com ``settings`` pode alterar"""
+    s = settings
+    loc = [s.loc_x, s.loc_y, s.loc_z]
+    rot = [s.rot_x, s.rot_y, s.rot_z] if s.apply_rot and not s.consistent else [False] * 3
+    scale = [s.scale_x, s.scale_y, s.scale_z] if s.apply_scale and not s.consistent else [False] * 3
+    fit = [s.fit_x, s.fit_y, s.fit_z] if s.apply_dim and not s.consistent else [False] * 3
+    # Fit desloca o objeto em todos os eixos para manter o centro no lugar
+    if any(fit):
+        loc = [True] * 3
+    scale = [a or b for a, b in zip(scale, fit)]
+    # A grade "limpa" todos os eixos
+    if s.snap:
+        if s.snap_location > 0.0:
+            loc = [True] * 3
+        if s.snap_rotation > 0.0:
+            rot = [True] * 3
+        if s.snap_scale > 0.0:
+            scale = [True] * 3
+
+    axes = {}
+    for channel, enabled in (("location", loc), ("rotation", rot), ("scale", scale)):
+        indices = tuple(i for i in range(3) if enabled[i])
+        if indices:
+            axes[channel] = indices
+    return axes
+
+
+def insert_keyframes(action, data_path, index, frames, values):
+    """Substitui as chaves de um canal no intervalo de ``frames`` via foreach_set.
+
+    A F-Curve existente é mantida: chaves fora do intervalo não perdem
+    interpolação nem handles, e modificadores e extrapolação continuam.
+    """
+    new = np.column_stack([frames, values]).astype(np.float32)
+
+    fc = action.fcurves.find(data_path, index=index)
+    if fc is None:
+        fc = action.fcurves.new(data_path, index=index, action_group="Object Transforms")
+    points = fc.keyframe_points
+
+    co = np.empty(len(points) * 2, dtype=np.float32)
+    points.foreach_get("co", co)
+    co = co.reshape(-1, 2)
+    inside = np.flatnonzero((co[:, 0] >= frames[0]) & (co[:, 0] <= frames[-1]))
+    # De trás para frente: os índices que faltam remover continuam válidos
+    for i in inside[::-1]:
+        points.remove(points[int(i)], fast=True)
+    co = np.delete(co, inside, axis=0)
+
+    # As chaves novas entram no fim; o co das antigas é regravado sem mudança
+    points.add(len(new))
+    points.foreach_set("co", np.concatenate([co, new]).ravel())
+    fc.update()
+    return fc
+
+
+def bake_alignment(objects, active, settings, frame_start, frame_end, frame_step=1,
+                   write=True, cursor=None):
+    """Calcula o alinhamento de ``objects`` ao ``active`` em cada frame do intervalo.
+
+    Só o subject "Object" pode ser assado. Os resultados de todos os frames vão
+    para arrays e, com ``write=True``, viram keyframes numa única passada.
+    ``cursor`` é exigido pela referência "Cursor" (ver ``align_objects``).
+    """
+    if settings.subject != "0":
+        raise ValueError("Only the Object subject can be baked")
+    if frame_end < frame_start:
+        raise ValueError("frame_end must not be before frame_start")
+
+    proxies = {}
+
+    def proxy_of(obj):
+        proxy = proxies.get(obj)
+        if proxy is None:
+            parent = proxy_of(obj.parent) if obj.parent is not None else None
+            proxy = proxies[obj] = _FrameProxy(obj, parent)
+        return proxy
+
+    sel_proxies = [proxy_of(obj) for obj in objects]
+    act_proxy = proxy_of(active)
+    # Pais antes dos filhos: a matrix_world do pai já vale ao avaliar o filho
+    ordered = list(proxies.values())
+
+    frames = np.arange(frame_start, frame_end + 1, max(1, frame_step), dtype=np.float32)
+    targets = None
+    locations = rotations = scales = None
+
+    for f, frame in enumerate(frames):
+        for proxy in ordered:
+            proxy.evaluate(float(frame))
+
+        result = align_objects(sel_proxies, act_proxy, settings, cursor, dry_run=True)
+        if targets is None:
+            targets = list(result.objects)
+            shape = (len(frames), len(targets), 3)
+            locations = np.empty(shape, dtype=np.float32)
+            rotations = np.empty(shape[:2] + (4,), dtype=np.float32)
+            scales = np.empty(shape, dtype=np.float32)
+
+        pos = {proxy: i for i, proxy in enumerate(result.objects)}
+        order = [pos[proxy] for proxy in targets]
+        locations[f] = result.locations[order]
+        rotations[f] = result.rotations[order]
+        scales[f] = result.scales[order]
+
+    bake = AlignBake(
+        objects=[proxy.original for proxy in targets or ()],
+        frames=frames,
+        locations=locations,
+        rotations=rotations,
+        scales=scales,
+        axes=baked_axes(settings),
+    )
+    if write:
+        bake.write_keyframes()
+    return bake
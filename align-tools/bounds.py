@@ -0,0 +1,701 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+from contextlib import contextmanager
+import itertools
+import time
+import weakref
+import zlib
+
+from mathutils import Vector
+import numpy as np
+
+from .diskcache import (
+    library_key,
+    library_store,
+)
+from .host import bpy
+
+
+# ------------------------------------------------------------------------
+# Reference Points
+# ------------------------------------------------------------------------
+
+# Direções (eixos, diagonais das faces e dos vértices) usadas para achar os
+# pontos extremos que delimitam o fecho convexo aproximado
+_HULL_DIRECTIONS = np.array(
+    [d for d in itertools.product((-1.0, 0.0, 1.0), repeat=3) if any(d)]
+)
+_HULL_MIN_POINTS = 64
+# Razão entre valores singulares abaixo da qual os extremos são planos/colineares
+_HULL_FLAT_RATIO = 1e-7
+# Distância (relativa ao tamanho) para considerar um ponto sobre uma face
+_HULL_TOLERANCE = 1e-9
+# Triângulos com área relativa menor que isso não definem plano confiável
+_HULL_SLIVER_RATIO = 1e-12
+# Leituras menores que isso são ruidosas demais para medir o tempo por ponto
+_TIMING_MIN_POINTS = 10000
+
+
+def _read_buffer(seq, attr, width=3):
+    """foreach_get de ``attr`` -> array (N, 3) float32"""
+    co = np.empty(len(seq) * width, dtype=np.float32)
+    seq.foreach_get(attr, co)
+    return co.reshape(-1, width)[:, :3]
+
+
+def _read_mesh(obj):
+    me = obj.data
+    if len(me.vertices) == 0:
+        return None
+    return _read_buffer(me.vertices, "co")
+
+
+def _read_curve(obj):
+    chunks = []
+    for s in getattr(obj.data, "splines", ()):
+        bezier_points = getattr(s, "bezier_points", None)
+        if bezier_points:
+            chunks.append(_read_buffer(bezier_points, "co"))
+        points = getattr(s, "points", None)
+        if points:
+            # Points de NURBS/poly são (x, y, z, w)
+            chunks.append(_read_buffer(points, "co", 4))
+    if chunks:
+        return np.concatenate(chunks)
+    if obj.type == 'FONT':
+        return _read_bound_box(obj)
+    return None
+
+
+def _read_position_attribute(attributes):
+    position = attributes.get("position") if attributes is not None else None
+    if position is None or len(position.data) == 0:
+        return None
+    return _read_buffer(position.data, "vector")
+
+
+def _read_pointcloud(obj):
+    pointcloud = obj.data
+    co = _read_position_attribute(getattr(pointcloud, "attributes", None))
+    if co is None and len(getattr(pointcloud, "points", ())):
+        co = _read_buffer(pointcloud.points, "co")
+    return co
+
+
+def _read_gpencil(obj):
+    """Grease Pencil legado: pontos dos traços no frame ativo de cada layer"""
+    chunks = []
+    for layer in obj.data.layers:
+        frame = layer.active_frame
+        if layer.hide or frame is None:
+            continue
+        for stroke in frame.strokes:
+            if len(stroke.points):
+                chunks.append(_read_buffer(stroke.points, "co"))
+    return np.concatenate(chunks) if chunks else None
+
+
+def _read_grease_pencil(obj):
+    """Grease Pencil v3: atributo ``position`` do drawing atual de cada layer"""
+    chunks = []
+    for layer in obj.data.layers:
+        frame = layer.current_frame()
+        if layer.hide or frame is None or frame.drawing is None:
+            continue
+        co = _read_position_attribute(frame.drawing.attributes)
+        if co is not None:
+            chunks.append(co)
+    return np.concatenate(chunks) if chunks else None
+
+
+def _read_armature(obj):
+    """Cabeças e caudas dos bones (pose atual, ou repouso sem pose)"""
+    bones = obj.pose.bones if obj.pose is not None else obj.data.bones
+    if len(bones) == 0:
+        return None
+    if obj.pose is not None:
+        return np.concatenate([_read_buffer(bones, "head"), _read_buffer(bones, "tail")])
+    return np.concatenate([_read_buffer(bones, "head_local"), _read_buffer(bones, "tail_local")])
+
+
+def _read_lattice(obj):
+    points = obj.data.points
+    if len(points) == 0:
+        return None
+    return _read_buffer(points, "co_deform")
+
+
+# Extensão do desenho de cada tipo de empty, em unidades de empty_display_size
+_EMPTY_EXTENTS = {
+    'ARROWS': ((0.0, 0.0, 0.0), (1.0, 1.0, 1.0)),
+    'SINGLE_ARROW': ((0.0, 0.0, 0.0), (0.0, 0.0, 1.0)),
+    'CIRCLE': ((-1.0, -1.0, 0.0), (1.0, 1.0, 0.0)),
+}
+
+
+def _read_empty(obj):
+    lo, hi = _EMPTY_EXTENTS.get(obj.empty_display_type, ((-1.0,) * 3, (1.0,) * 3))
+    corners = np.array(list(itertools.product(*zip(lo, hi))), dtype=np.float32)
+    return corners * obj.empty_display_size
+
+
+def _read_bound_box(obj):
+    co = np.array([tuple(c) for c in obj.bound_box], dtype=np.float32).reshape(-1, 3)
+    if len(co) == 0 or not (co.max(axis=0) - co.min(axis=0)).any():
+        return None
+    return co
+
+
+_READERS = {
+    'MESH': _read_mesh,
+    'CURVE': _read_curve,
+    'SURFACE': _read_curve,
+    'FONT': _read_curve,
+    'POINTCLOUD': _read_pointcloud,
+    'GPENCIL': _read_gpencil,
+    'GREASEPENCIL': _read_grease_pencil,
+    'ARMATURE': _read_armature,
+    'LATTICE': _read_lattice,
+    'EMPTY': _read_empty,
+    'VOLUME': _read_bound_box,
+    'META': _read_bound_box,
+}
+
+# Tipos cuja extensão depende do objeto e não só do datablock
+_PER_OBJECT_TYPES = {'ARMATURE', 'EMPTY'}
+
+
+def read_local_coords(obj):
+    """Coordenadas locais (N, 3) float32 lidas em bloco, ou None sem geometria"""
+    reader = _READERS.get(obj.type)
+    if reader is None or (obj.data is None and obj.type != 'EMPTY'):
+        return None
+    return reader(obj)
+
+
+# ------------------------------------------------------------------------
+# Content Hash
+# ------------------------------------------------------------------------
+
+def content_hash(co):
+    """Hash de 16 bytes do buffer de coordenadas: contagem, crc32 e adler32.
+
+    Os dois checksums do zlib percorrem o buffer cru na velocidade de uma
+    cópia de memória, bem abaixo do custo de recalcular o fecho.
+    """
+    buf = memoryview(np.ascontiguousarray(co)).cast("B")
+    return (len(co).to_bytes(8, "little")
+            + zlib.crc32(buf).to_bytes(4, "little")
+            + zlib.adler32(buf).to_bytes(4, "little"))
+
+
+def geometry_hash(obj):
+    """Hash do conteúdo da geometria de ``obj`` (None sem geometria legível)"""
+    co = read_local_coords(obj)
+    return None if co is None else content_hash(co)
+
+
+def hull_candidates(co):
+    """Descarta os pontos estritamente internos ao fecho dos pontos extremos.
+
+    Nenhum ponto interno pode ser o mínimo/máximo de uma transformação afim,
+    então o AABB mundial calculado com os pontos restantes é exato.
+    """
+    if len(co) <= _HULL_MIN_POINTS:
+        return co
+
+    ext = co[np.unique((co @ _HULL_DIRECTIONS.T).argmax(axis=0))].astype(np.float64)
+    if len(ext) < 4:
+        return co
+
+    # Trabalha centrado nos extremos: as tolerâncias ficam relativas ao
+    # tamanho da forma e não à distância até a origem
+    center = ext.mean(axis=0)
+    ext -= center
+    _, sv, vt = np.linalg.svd(ext, full_matrices=False)
+    if sv[1] <= _HULL_FLAT_RATIO * sv[0]:
+        return co  # extremos colineares
+    if sv[2] <= _HULL_FLAT_RATIO * sv[0]:
+        # Extremos coplanares: as faces seriam fatias degeneradas. Usa o
+        # prisma que os envolve dos dois lados do plano; o erro fica limitado
+        # à espessura real, abaixo da precisão de float32.
+        depth = vt[2] * sv[0]
+        ext = np.concatenate((ext + depth, ext - depth))
+
+    # Faces do fecho dos extremos por força bruta (no máximo 52 pontos)
+    tri = np.array(list(itertools.combinations(range(len(ext)), 3)))
+    a, b, c = ext[tri[:, 0]], ext[tri[:, 1]], ext[tri[:, 2]]
+    normals = np.cross(b - a, c - a)
+    lengths = np.linalg.norm(normals, axis=1)
+    valid = lengths > _HULL_SLIVER_RATIO * sv[0] ** 2
+    normals = normals[valid] / lengths[valid, None]
+    offsets = (normals * a[valid]).sum(axis=1)
+    tol = _HULL_TOLERANCE * sv[0]
+
+    side = ext @ normals.T - offsets
+    above = (side > tol).any(axis=0)
+    below = (side < -tol).any(axis=0)
+    faces = above != below
+    if not faces.any():
+        return co
+
+    # Orienta as normais para fora
+    flip = np.where(above[faces], -1.0, 1.0)
+    normals = normals[faces] * flip[:, None]
+    offsets = offsets[faces] * flip + normals @ center
+
+    # Margem extra para o arredondamento de coordenadas longe da origem
+    tol = tol + 1e-12 * np.abs(center).max()
+    inside = ((co @ normals.T - offsets) < -tol).all(axis=1)
+    return co[~inside]
+
+
+def _ref_points_from_minmax(co_min, co_max):
+    min_x, min_y, min_z = (float(v) for v in co_min)
+    max_x, max_y, max_z = (float(v) for v in co_max)
+    return [
+        min_x, (min_x + max_x) * 0.5, max_x,
+        min_y, (min_y + max_y) * 0.5, max_y,
+        min_z, (min_z + max_z) * 0.5, max_z,
+    ]
+
+
+def _data_key(data):
+    library = getattr(data, "library", None)
+    return data.name, library.filepath if library is not None else None
+
+
+def _bounds_key(obj):
+    if obj.type in _PER_OBJECT_TYPES or obj.data is None:
+        return ("OBJECT",) + _data_key(obj)
+    return _data_key(obj.data)
+
+
+def _geometry_stamp(obj):
+    """Assinatura barata para validar um resumo (None: confia na invalidação)"""
+    if obj.type == 'MESH':
+        return len(obj.data.vertices)
+    if obj.type in {'CURVE', 'SURFACE', 'FONT'}:
+        count = 0
+        for s in obj.data.splines:
+            bezier_points = getattr(s, "bezier_points", None)
+            if bezier_points:
+                count += len(bezier_points)
+            points = getattr(s, "points", None)
+            if points:
+                count += len(points)
+        return count
+    if obj.type == 'EMPTY':
+        return obj.empty_display_type, obj.empty_display_size
+    return None
+
+
+class LocalBounds:
+    """Resumo local de uma geometria: AABB local e pontos do fecho convexo"""
+    __slots__ = ("stamp", "digest", "ref_points", "hull", "__weakref__")
+
+    def __init__(self, co, stamp=None, digest=None):
+        self.stamp = stamp
+        self.digest = digest
+        self.ref_points = _ref_points_from_minmax(co.min(axis=0), co.max(axis=0))
+        self.hull = hull_candidates(co).astype(np.float64)
+
+    @classmethod
+    def from_summary(cls, ref_points, hull, stamp=None, digest=None):
+        """Resumo já calculado (ex.: lido do cache em disco)"""
+        entry = cls.__new__(cls)
+        entry.stamp = stamp
+        entry.digest = digest
+        entry.ref_points = list(ref_points)
+        entry.hull = hull
+        return entry
+
+    def world_ref_points(self, matrix):
+        mtx = np.array(matrix, dtype=np.float64)
+        co = self.hull @ mtx[:3, :3].T + mtx[:3, 3]
+        return _ref_points_from_minmax(co.min(axis=0), co.max(axis=0))
+
+
+def has_instances(obj):
+    """Instancia uma coleção ou pode gerar instâncias por geometry nodes"""
+    if getattr(obj, "instance_type", 'NONE') == 'COLLECTION':
+        return getattr(obj, "instance_collection", None) is not None
+    return any(mod.type == 'NODES' for mod in getattr(obj, "modifiers", ()))
+
+
+def _evaluated_depsgraph():
+    get = getattr(bpy.context, "evaluated_depsgraph_get", None)
+    return get() if get is not None else None
+
+
+def _transform_hulls(hull, matrices):
+    """Fecho (K, 3) levado por M matrizes (M, 4, 4) de uma vez -> (M*K, 3)"""
+    co = np.einsum("mij,kj->mki", matrices[:, :3, :3], hull) + matrices[:, None, :3, 3]
+    return co.reshape(-1, 3)
+
+
+class BoundsCache:
+    """Resumos locais por datablock e bounds mundiais por objeto.
+
+    A geometria só é relida quando o datablock é invalidado (handler de
+    depsgraph com ``is_updated_geometry``) ou muda de assinatura;
+    mudanças só de transformação recalculam os bounds a partir do fecho.
+    Ao reler, o hash do conteúdo reaproveita o resumo de qualquer geometria
+    idêntica (a mesma antes da invalidação, duplicatas, cache em disco) e o
+    fecho só é recalculado quando as coordenadas de fato mudaram.
+
+    Objetos que instanciam coleções ou geram instâncias (geometry nodes) têm
+    um resumo próprio, no espaço local do instanciador, montado a partir de
+    ``depsgraph.object_instances`` com os resumos locais de cada fonte.
+
+    Com ``approximate`` ligado, geometria ainda fora do cache usa a caixa do
+    ``bound_box`` em vez de ser lida; ``estimate_seconds`` diz quanto a
+    leitura exata custaria, a partir das contagens de pontos e do tempo
+    medido nas leituras anteriores.
+    """
+
+    # Tempo de leitura + hash + fecho por ponto, antes da primeira medição
+    seconds_per_point = 5e-8
+
+    def __init__(self):
+        self.approximate = False
+        # Estatísticas sobrevivem ao clear: só servem para estimar custo
+        self.point_counts = {}  # chave do resumo/nome do instanciador -> pontos lidos
+        self.clear()
+
+    def clear(self):
+        self.local = {}  # (nome do datablock, biblioteca) -> LocalBounds
+        self.stale = {}  # entradas invalidadas, à espera de revalidação pelo hash
+        self.by_hash = weakref.WeakValueDictionary()  # hash do conteúdo -> LocalBounds
+        self.world = {}  # nome do objeto -> (matrix_world, LocalBounds, ref points)
+        self.instances = {}  # nome do instanciador -> LocalBounds (ou None sem instâncias)
+        self.instance_sources = {}  # nome/chave da fonte -> nomes dos instanciadores
+        self.boxes = {}  # chave do resumo -> LocalBounds do bound_box (modo aproximado)
+
+    def invalidate(self, id_data):
+        """Descarta o que depende de um objeto ou datablock de geometria"""
+        keys = []
+        if isinstance(id_data, bpy.types.Object):
+            self.world.pop(id_data.name, None)
+            self.instances.pop(id_data.name, None)
+            self.invalidate_instances((id_data.name,))
+            keys.append(("OBJECT",) + _data_key(id_data))
+            id_data = id_data.data
+        if id_data is not None:
+            keys.append(_data_key(id_data))
+        self.invalidate_instances(keys)
+        for key in keys:
+            self.boxes.pop(key, None)
+            entry = self.local.pop(key, None)
+            if entry is not None:
+                self.stale[key] = entry
+
+    def invalidate_instances(self, sources):
+        """Descarta os instanciadores que usam alguma das fontes (nomes ou chaves).
+
+        Retorna os nomes dos instanciadores afetados.
+        """
+        affected = set()
+        for source in sources:
+            for name in self.instance_sources.pop(source, ()):
+                self.instances.pop(name, None)
+                affected.add(name)
+        return affected
+
+    def apply_updates(self, updates):
+        """Invalida o que os ``depsgraph.updates`` reportam como alterado.
+
+        Retorna (objetos movidos ou editados, nomes dos instanciadores afetados).
+        """
+        moved = []
+        for update in updates:
+            id_data = update.id.original
+            if update.is_updated_geometry:
+                # Qualquer datablock com geometria (mesh, curva, point cloud,
+                # grease pencil, volume...) ou objeto (pose, empty)
+                self.invalidate(id_data)
+            if isinstance(id_data, bpy.types.Object) and (
+                    update.is_updated_transform or update.is_updated_geometry):
+                moved.append(id_data)
+        # Fontes movidas ou editadas mudam a extensão de quem as instancia
+        return moved, self.invalidate_instances({obj.name for obj in moved})
+
+    def local_bounds(self, obj):
+        if obj.type not in _READERS:
+            return None
+
+        key = _bounds_key(obj)
+        stamp = _geometry_stamp(obj)
+        entry = self.local.get(key)
+        if entry is not None and entry.stamp == stamp:
+            return entry
+
+        start = time.perf_counter()
+        entry = self._read_bounds(obj, key, stamp)
+        count = self.point_counts.get(key, 0)
+        if entry is not None and count >= _TIMING_MIN_POINTS:
+            per_point = (time.perf_counter() - start) / count
+            self.seconds_per_point += 0.25 * (per_point - self.seconds_per_point)
+        return entry
+
+    def _read_bounds(self, obj, key, stamp):
+        co = read_local_coords(obj)
+        self.stale.pop(key, None)
+        if co is None:
+            self.local.pop(key, None)
+            return None
+        self.point_counts[key] = len(co)
+
+        digest = content_hash(co)
+        entry = self.by_hash.get(digest)
+        if entry is not None:
+            if entry.stamp != stamp:
+                entry = LocalBounds.from_summary(entry.ref_points, entry.hull, stamp, digest)
+            self.local[key] = entry
+            return entry
+
+        library = getattr(obj.data, "library", None) if obj.type not in _PER_OBJECT_TYPES else None
+        if library is None:
+            entry = LocalBounds(co, stamp, digest)
+        else:
+            # Geometria linkada: o resumo pode vir do cache em disco de outra sessão
+            lib_key = library_key(library.filepath, obj.data.name)
+            stored = library_store.get(lib_key, digest)
+            if stored is not None:
+                entry = LocalBounds.from_summary(*stored, stamp, digest)
+            else:
+                entry = LocalBounds(co, stamp, digest)
+                library_store.put(lib_key, digest, entry.ref_points, entry.hull)
+        self.local[key] = self.by_hash[digest] = entry
+        return entry
+
+    def prepare_instances(self, objects, depsgraph=None):
+        """Monta numa única passada pelas instâncias os resumos que faltam"""
+        wanted = {obj.name: obj for obj in objects
+                  if obj.name not in self.instances and has_instances(obj)}
+        if not wanted:
+            return
+        if depsgraph is None:
+            depsgraph = _evaluated_depsgraph()
+        if depsgraph is None:
+            return
+
+        # instanciador -> {id do resumo da fonte: (LocalBounds, matrizes)}
+        groups = {name: {} for name in wanted}
+        own = {}
+        geometry = {}
+        for inst in depsgraph.object_instances:
+            if not inst.is_instance:
+                # Geometria realizada do próprio instanciador (avaliada)
+                name = inst.object.original.name
+                if name in wanted and wanted[name].type != 'EMPTY':
+                    co = read_local_coords(inst.object)
+                    if co is not None:
+                        own[name] = hull_candidates(co).astype(np.float64)
+                continue
+            name = inst.parent.original.name
+            if name not in wanted:
+                continue
+
+            source = inst.object.original
+            if source.name == name:
+                # Geometria instanciada pelos nodes: existe só no objeto avaliado
+                key = (name, inst.object.data.name)
+                if key not in geometry:
+                    co = read_local_coords(inst.object)
+                    geometry[key] = LocalBounds(co) if co is not None else None
+                entry = geometry[key]
+            else:
+                entry = self.local_bounds(source)
+                for source_key in (source.name, _bounds_key(source)):
+                    self.instance_sources.setdefault(source_key, set()).add(name)
+            if entry is None:
+                continue
+            group = groups[name].get(id(entry))
+            if group is None:
+                group = groups[name][id(entry)] = (entry, [])
+            # A instância é temporária: a matriz precisa ser copiada já
+            group[1].append(np.array(inst.matrix_world, dtype=np.float64))
+
+        for name, obj in wanted.items():
+            if not groups[name]:
+                self.instances[name] = None
+                continue
+            to_local = np.linalg.inv(np.array(obj.matrix_world, dtype=np.float64))
+            chunks = [own[name]] if name in own else []
+            for entry, matrices in groups[name].values():
+                chunks.append(_transform_hulls(entry.hull, to_local @ np.array(matrices)))
+            co = np.concatenate(chunks)
+            self.point_counts[name] = len(co)
+            self.instances[name] = LocalBounds(co)
+
+    def _cached_local(self, obj):
+        """Resumo exato já em cache e ainda válido, sem ler a geometria"""
+        entry = self.local.get(_bounds_key(obj))
+        if entry is not None and entry.stamp == _geometry_stamp(obj):
+            return entry
+        return None
+
+    def box_bounds(self, obj):
+        """Resumo exato se já em cache, senão a caixa do ``bound_box``"""
+        if obj.type not in _READERS or obj.type in _PER_OBJECT_TYPES:
+            return self.local_bounds(obj)
+        entry = self._cached_local(obj)
+        if entry is not None:
+            return entry
+        key = _bounds_key(obj)
+        entry = self.boxes.get(key)
+        if entry is None:
+            co = _read_bound_box(obj)
+            if co is None:
+                return self.local_bounds(obj)
+            entry = self.boxes[key] = LocalBounds(co)
+        return entry
+
+    @contextmanager
+    def approximated(self, enabled=True):
+        """Liga o modo aproximado durante o bloco"""
+        previous = self.approximate
+        self.approximate = enabled
+        try:
+            yield self
+        finally:
+            self.approximate = previous
+
+    def estimate_seconds(self, objects):
+        """Custo estimado dos bounds exatos de ``objects`` que faltam no cache.
+
+        Usa só contagens baratas (vértices, pontos das splines) ou as da última
+        leitura, sem tocar na geometria.
+        """
+        points = 0
+        seen = set()
+        for obj in objects:
+            if has_instances(obj):
+                if obj.name not in self.instances:
+                    points += self.point_counts.get(obj.name, 0)
+                continue
+            if obj.type not in _READERS or obj.type in _PER_OBJECT_TYPES:
+                continue
+            key = _bounds_key(obj)
+            if key in seen or self._cached_local(obj) is not None:
+                continue
+            seen.add(key)
+            stamp = _geometry_stamp(obj)
+            points += stamp if isinstance(stamp, int) else self.point_counts.get(key, 0)
+        return points * self.seconds_per_point
+
+    def _summary(self, obj):
+        """Resumo local usado pelos ref points de ``obj`` (None sem geometria)"""
+        if has_instances(obj):
+            if obj.name not in self.instances:
+                self.prepare_instances((obj,))
+            return self.instances.get(obj.name) or self.local_bounds(obj)
+        if self.approximate:
+            return self.box_bounds(obj)
+        return self.local_bounds(obj)
+
+    def ref_points_at(self, obj, matrix):
+        """Ref points globais que ``obj`` teria com ``matrix`` como matrix_world"""
+        entry = self._summary(obj)
+        if entry is None:
+            a = matrix.translation
+            return [a.x, a.x, a.x, a.y, a.y, a.y, a.z, a.z, a.z]
+        return entry.world_ref_points(matrix)
+
+    def ref_points(self, obj, space):
+        entry = self._summary(obj)
+        if entry is None:
+            a = obj.matrix_world.translation
+            return [a.x, a.x, a.x, a.y, a.y, a.y, a.z, a.z, a.z]
+
+        if space == "local":
+            return list(entry.ref_points)
+
+        mtx = obj.matrix_world
+        stamp = tuple(v for row in mtx for v in row)
+        cached = self.world.get(obj.name)
+        if cached is not None and cached[0] == stamp and cached[1] is entry:
+            return list(cached[2])
+
+        ref_points = entry.world_ref_points(mtx)
+        self.world[obj.name] = (stamp, entry, ref_points)
+        return list(ref_points)
+
+
+bounds_cache = BoundsCache()
+
+
+def get_reference_points(obj, space):
+    """Retorna [minX, centerX, maxX, minY, centerY, maxY, minZ, centerZ, maxZ]"""
+    return bounds_cache.ref_points(obj, space)
+
+
+def get_sel_ref(ref_co, objects, ref_points_of=None):
+    """Min e max da seleção em torno de um ponto interno"""
+    if ref_points_of is None:
+        def ref_points_of(obj):
+            return get_reference_points(obj, "global")
+
+    max_x = ref_co.x
+    min_x = ref_co.x
+    max_y = ref_co.y
+    min_y = ref_co.y
+    max_z = ref_co.z
+    min_z = ref_co.z
+
+    for obj in objects:
+        ref_points = ref_points_of(obj)
+        if ref_co.x < ref_points[0]:
+            min_x = ref_points[0]
+        if ref_co.x > ref_points[2]:
+            max_x = ref_points[2]
+        if ref_co.y < ref_points[3]:
+            min_y = ref_points[3]
+        if ref_co.y > ref_points[5]:
+            max_y = ref_points[5]
+        if ref_co.z < ref_points[6]:
+            min_z = ref_points[6]
+        if ref_co.z > ref_points[8]:
+            max_z = ref_points[8]
+
+    sel_min = Vector((min_x, min_y, min_z))
+    sel_max = Vector((max_x, max_y, max_z))
+    return sel_min, sel_max
+
+
+def point_in_selection(active, objects):
+    """Pega um ponto qualquer dentro da seleção (primeiro vértice/point que achar)"""
+    ref_ob = None
+    ref_co = None
+
+    for o in objects:
+        if o == active:
+            continue
+        ref_ob = o
+        obj_mtx = o.matrix_world
+        me = getattr(o, "data", None)
+
+        if o.type == 'MESH' and me and len(me.vertices) > 0:
+            ref_co = obj_mtx @ me.vertices[0].co
+            break
+        elif o.type in {'CURVE', 'SURFACE', 'FONT'} and me and len(getattr(me, "splines", [])) > 0:
+            for s in me.splines:
+                if getattr(s, "bezier_points", None):
+                    ref_co = obj_mtx @ s.bezier_points[0].co
+                    break
+                if getattr(s, "points", None):
+                    ref_co = obj_mtx @ s.points[0].co
+                    break
+            if ref_co is not None:
+                break
+
+    if ref_co is None:
+        if ref_ob is not None:
+            ref_co = ref_ob.matrix_world.translation.copy()
+        else:
+            ref_co = active.matrix_world.translation.copy()
+
+    return ref_co
@@ -0,0 +1,912 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+from dataclasses import dataclass, field, fields
+
+from mathutils import Euler, Matrix, Quaternion, Vector
+import numpy as np
+
+from .bounds import (
+    bounds_cache,
+    get_reference_points,
+    get_sel_ref,
+    has_instances,
+    point_in_selection,
+)
+from .host import bpy
+
+
+# ------------------------------------------------------------------------
+# Advanced Align Core
+# ------------------------------------------------------------------------
+
+@dataclass
+class AlignSettings:
+    """Opções do alinhamento avançado (mesmos nomes do OBJECT_OT_align_tools)"""
+    subject: str = "0"
+    active_too: bool = False
+    consistent: bool = False
+    self_or_active: str = "1"
+    loc_x: bool = False
+    loc_y: bool = False
+    loc_z: bool = False
+    ref1: str = "0"
+    ref2: str = "3"
+    loc_offset: tuple = (0.0, 0.0, 0.0)
+    rot_x: bool = False
+    rot_y: bool = False
+    rot_z: bool = False
+    rot_offset: tuple = (0.0, 0.0, 0.0)
+    apply_rot: bool = False
+    scale_x: bool = False
+    scale_y: bool = False
+    scale_z: bool = False
+    scale_offset: tuple = (0.0, 0.0, 0.0)
+    apply_scale: bool = False
+    fit_x: bool = False
+    fit_y: bool = False
+    fit_z: bool = False
+    apply_dim: bool = False
+    snap: bool = False
+    snap_location: float = 0.0  # tamanho da grade (0 desliga)
+    snap_reference: str = "2"  # ponto que cai na grade: Min/Center/Pivot/Max
+    snap_rotation: float = 0.0  # incremento em radianos
+    snap_scale: float = 0.0
+
+    @classmethod
+    def from_operator(cls, op):
+        """Copia as propriedades de um OBJECT_OT_align_tools (ou similar)"""
+        return cls(**{f.name: getattr(op, f.name) for f in fields(cls)})
+
+
+def can_shift_geometry(obj):
+    """Geometria local pode ser deslocada (mesh/curva local, fora do edit mode)"""
+    me = getattr(obj, "data", None)
+    if me is None or obj.type not in {'MESH', 'CURVE', 'SURFACE'}:
+        return False
+    return getattr(me, "library", None) is None and not getattr(me, "is_editmode", False)
+
+
+# Tipos com geometria própria; nos demais (empty, luz, câmera...) a origem é o objeto
+_GEOMETRY_TYPES = {
+    'MESH', 'CURVE', 'SURFACE', 'FONT', 'META', 'POINTCLOUD', 'CURVES',
+    'GPENCIL', 'GREASEPENCIL', 'ARMATURE', 'LATTICE', 'VOLUME',
+}
+
+
+def keeps_origin(obj):
+    """Tem geometria visível que não pode ser deslocada (texto, lattice, point
+    cloud, dados linkados ou em edit mode...): mover a origem pelo ``location``
+    moveria a geometria junto"""
+    return obj.type in _GEOMETRY_TYPES and not can_shift_geometry(obj)
+
+
+def _shift_buffer(seq, attr, stride, offset):
+    if not len(seq):
+        return
+    co = np.empty(len(seq) * stride, dtype=np.float32)
+    seq.foreach_get(attr, co)
+    co.reshape(-1, stride)[:, :3] += offset
+    seq.foreach_set(attr, co)
+
+
+def _shift_curve_keys(data, offset):
+    """Desloca os shape keys de uma curva (pontos bezier também têm alças)"""
+    bezier = [bool(s.bezier_points) for s in data.splines]
+    for key_block in data.shape_keys.key_blocks:
+        points = key_block.data
+        if all(bezier) or not any(bezier):
+            attrs = ("co", "handle_left", "handle_right") if any(bezier) else ("co",)
+            for attr in attrs:
+                _shift_buffer(points, attr, 3, offset)
+            continue
+        # Splines mistas: os elementos não têm todos os mesmos atributos
+        delta = Vector(offset.tolist())
+        for point in points:
+            point.co = point.co + delta
+            if hasattr(point, "handle_left"):
+                point.handle_left = point.handle_left + delta
+                point.handle_right = point.handle_right + delta
+
+
+def shift_geometry(data, offset):
+    """Soma ``offset`` (espaço local) a todas as coordenadas de ``data``"""
+    offset = np.asarray(offset, dtype=np.float32)
+
+    if hasattr(data, "vertices"):
+        _shift_buffer(data.vertices, "co", 3, offset)
+        if data.shape_keys is not None:
+            for key_block in data.shape_keys.key_blocks:
+                _shift_buffer(key_block.data, "co", 3, offset)
+        data.update()
+    else:
+        for s in data.splines:
+            if s.bezier_points:
+                for attr in ("co", "handle_left", "handle_right"):
+                    _shift_buffer(s.bezier_points, attr, 3, offset)
+            if s.points:
+                _shift_buffer(s.points, "co", 4, offset)
+        if data.shape_keys is not None:
+            _shift_curve_keys(data, offset)
+        data.update_tag()
+
+    bounds_cache.invalidate(data)
+
+
+def world_to_location_delta(obj, d_world):
+    """Converte um deslocamento em espaço mundial para o espaço de ``location``"""
+    if obj.parent is None:
+        return d_world
+    parent_mtx = obj.matrix_world @ obj.matrix_basis.inverted_safe()
+    return parent_mtx.to_3x3().inverted_safe() @ d_world
+
+
+def quantize(values, step):
+    """Arredonda ``values`` para múltiplos de ``step`` (0 não altera)"""
+    if step <= 0.0:
+        return values
+    return np.round(values / step) * step
+
+
+def parent_matrix(obj):
+    """Matriz mundial do espaço do pai (inclui matrix_parent_inverse), ou None"""
+    if obj.parent is None:
+        return None
+    return obj.parent.matrix_world @ obj.matrix_parent_inverse
+
+
+def staged_matrix(obj, location, rotation, scale, parent_mtx=None):
+    """matrix_world que ``obj`` terá com os valores de location/rotação/escala dados,
+    sob o espaço do pai ``parent_mtx`` (None = sem pai)"""
+    basis = (Matrix.Translation(Vector(location))
+             @ rotation_to_matrix(obj.rotation_mode, rotation).to_4x4()
+             @ Matrix.Diagonal(Vector(scale)).to_4x4())
+    return basis if parent_mtx is None else parent_mtx @ basis
+
+
+def snap_transforms(result, settings):
+    """Aplica a grade de rotação e escala a todo o resultado de uma vez"""
+    if not result.objects:
+        return
+
+    result.rotations = snap_rotations(result.objects, result.rotations,
+                                      settings.snap_rotation).astype(np.float32)
+
+    if settings.snap_scale > 0.0:
+        scales = quantize(result.scales, settings.snap_scale)
+        # Nunca zera a escala
+        scales = np.where(scales == 0.0, np.copysign(settings.snap_scale, result.scales), scales)
+        result.scales = scales.astype(np.float32)
+
+
+def snap_locations(result, settings):
+    """Leva à grade o ponto ``snap_reference`` de cada objeto, medido com a
+    transformação final.
+
+    Pais vêm antes dos filhos: cada nível de parentesco é medido e convertido
+    para o espaço do pai com as matrizes já levadas à grade no nível anterior.
+    Gerador: pausa a cada ``ALIGN_CHUNK`` objetos.
+    """
+    objects = result.objects
+    if not objects or settings.snap_location <= 0.0:
+        return
+    offset = {"0": 0, "1": 1, "3": 2}.get(settings.snap_reference)
+    index = {obj: i for i, obj in enumerate(objects)}
+    worlds = {}  # objeto -> matrix_world final
+    depths = {}
+
+    def moved_ancestor(obj):
+        parent = obj.parent
+        while parent is not None and parent not in index:
+            parent = parent.parent
+        return parent
+
+    def depth_of(obj):
+        depth = depths.get(obj)
+        if depth is None:
+            ancestor = moved_ancestor(obj)
+            depth = depths[obj] = 0 if ancestor is None else depth_of(ancestor) + 1
+        return depth
+
+    def parent_space(obj):
+        if obj.parent is None:
+            return None
+        return world_of(obj.parent) @ obj.matrix_parent_inverse
+
+    def world_of(obj):
+        matrix = worlds.get(obj)
+        if matrix is None:
+            i = index.get(obj)
+            if i is None and moved_ancestor(obj) is None:
+                matrix = obj.matrix_world
+            elif i is None:
+                # Fora do resultado, mas abaixo de um objeto movido
+                matrix = parent_space(obj) @ obj.matrix_basis
+            else:
+                matrix = staged_matrix(obj, result.locations[i], result.rotations[i],
+                                       result.scales[i], parent_space(obj))
+            worlds[obj] = matrix
+        return matrix
+
+    levels = {}
+    for i, obj in enumerate(objects):
+        levels.setdefault(depth_of(obj), []).append(i)
+
+    done = 0
+    locations = result.locations.astype(np.float64)
+    for depth in sorted(levels):
+        rows = levels[depth]
+        ref_points = np.empty((len(rows), 3))
+        parent_mtx = np.broadcast_to(np.eye(3), (len(rows), 3, 3)).copy()
+        for k, i in enumerate(rows):
+            done += 1
+            if done % ALIGN_CHUNK == 0:
+                yield 1.0
+            obj = objects[i]
+            matrix = world_of(obj)
+            if offset is None:  # Pivot
+                ref_points[k] = matrix.translation
+            else:
+                ref_points[k] = bounds_cache.ref_points_at(obj, matrix)[offset::3]
+            space = parent_space(obj)
+            if space is not None:
+                parent_mtx[k] = np.array(space.to_3x3())
+
+        snap_world = quantize(ref_points, settings.snap_location) - ref_points
+        # Pseudo-inversa: pai com escala zero não levanta LinAlgError
+        snap_local = np.einsum("nij,nj->ni", np.linalg.pinv(parent_mtx), snap_world)
+        locations[rows] += snap_local
+        for k, i in enumerate(rows):
+            obj = objects[i]
+            worlds[obj] = Matrix.Translation(Vector(snap_world[k])) @ worlds[obj]
+    result.locations = locations.astype(np.float32)
+
+
+def pack_vectors(vectors):
+    """Lista de vetores -> array (N, 3) float32, mesmo layout do foreach_get"""
+    return np.array(vectors, dtype=np.float32).reshape(-1, 3)
+
+
+# ------------------------------------------------------------------------
+# Rotation Modes
+# ------------------------------------------------------------------------
+
+_ROTATION_PATHS = {'QUATERNION': "rotation_quaternion", 'AXIS_ANGLE': "rotation_axis_angle"}
+
+
+def rotation_path(rotation_mode):
+    """Propriedade RNA que guarda a rotação no ``rotation_mode`` dado"""
+    return _ROTATION_PATHS.get(rotation_mode, "rotation_euler")
+
+
+def rotation_values(obj):
+    """Rotação no layout do seu modo: euler (x, y, z, 0), quaternion (w, x, y, z)
+    ou axis-angle (ângulo, x, y, z)"""
+    values = tuple(getattr(obj, rotation_path(obj.rotation_mode)))
+    return values if len(values) == 4 else values + (0.0,)
+
+
+def pack_rotations(objects):
+    """Rotações de ``objects`` -> array (N, 4) float32 (ver ``rotation_values``)"""
+    return np.array([rotation_values(obj) for obj in objects], dtype=np.float32).reshape(-1, 4)
+
+
+def write_rotation(obj, values):
+    path = rotation_path(obj.rotation_mode)
+    setattr(obj, path, values[:3] if path == "rotation_euler" else values)
+
+
+def rotation_to_matrix(rotation_mode, values):
+    """Matriz 3x3 de rotação a partir de ``rotation_values``"""
+    if rotation_mode == 'QUATERNION':
+        return Quaternion(values).normalized().to_matrix()
+    if rotation_mode == 'AXIS_ANGLE':
+        return Quaternion(values[1:], values[0]).to_matrix()
+    return Euler(values[:3], rotation_mode).to_matrix()
+
+
+def rotation_from_matrix(rotation_mode, rot, compat):
+    """Decompõe ``rot`` no ``rotation_mode``, o mais próximo possível de ``compat``"""
+    if rotation_mode == 'QUATERNION':
+        quat = rot.to_quaternion()
+        quat.make_compatible(Quaternion(compat))
+        return tuple(quat)
+    if rotation_mode == 'AXIS_ANGLE':
+        axis, angle = rot.to_quaternion().to_axis_angle()
+        return (angle,) + tuple(axis)
+    return tuple(rot.to_euler(rotation_mode, Euler(compat[:3], rotation_mode))) + (0.0,)
+
+
+def parent_rotation(obj):
+    """Rotação mundial do espaço do pai (inclui matrix_parent_inverse), ou None"""
+    parent_mtx = parent_matrix(obj)
+    if parent_mtx is None:
+        return None
+    return parent_mtx.to_quaternion().to_matrix()
+
+
+def world_rotation(rotation_mode, values, parent_rot):
+    rot = rotation_to_matrix(rotation_mode, values)
+    return rot if parent_rot is None else parent_rot @ rot
+
+
+def aligned_rotation(rotation_mode, values, parent_rot, target, axes, offset=(0.0, 0.0, 0.0)):
+    """Copia os eixos ``axes`` da rotação mundial ``target`` para um objeto.
+
+    A troca de componentes é feita em euler mundial (na ordem do objeto, XYZ
+    para quaternion/axis-angle) e o resultado volta para o espaço do pai e para
+    o ``rotation_mode`` do objeto. Retorna os novos ``rotation_values``.
+    """
+    is_euler = rotation_path(rotation_mode) == "rotation_euler"
+    order = rotation_mode if is_euler else 'XYZ'
+    hint = Euler(values[:3], order) if is_euler else None
+
+    current = world_rotation(rotation_mode, values, parent_rot)
+    euler = current.to_euler(order, hint) if hint is not None else current.to_euler(order)
+    for i in range(3):
+        if axes[i]:
+            euler[i] = target[i] + offset[i]
+
+    rot = euler.to_matrix()
+    if parent_rot is None:
+        compat = tuple(euler) + (0.0,)
+    else:
+        rot = parent_rot.transposed() @ rot
+        compat = values
+    return rotation_from_matrix(rotation_mode, rot, compat)
+
+
+def target_rotation(obj, order, values=None):
+    """Euler mundial de ``obj`` na ``order`` dada (``values`` substitui os do objeto)"""
+    if values is None:
+        values = rotation_values(obj)
+    rot = world_rotation(obj.rotation_mode, values, parent_rotation(obj))
+    if rotation_path(obj.rotation_mode) == "rotation_euler":
+        return rot.to_euler(order, Euler(values[:3], obj.rotation_mode))
+    return rot.to_euler(order)
+
+
+def align_rotation(objects, active, axes=(True, True, True), offset=(0.0, 0.0, 0.0)):
+    """Alinha a rotação mundial de ``objects`` à do ``active`` numa única passada.
+
+    Funciona com qualquer ``rotation_mode`` e com objetos parentados.
+    """
+    objects = list(objects)
+    targets = {}
+    new_values = []
+    for obj in objects:
+        order = obj.rotation_mode if rotation_path(obj.rotation_mode) == "rotation_euler" else 'XYZ'
+        target = targets.get(order)
+        if target is None:
+            target = targets[order] = target_rotation(active, order)
+        new_values.append(aligned_rotation(obj.rotation_mode, rotation_values(obj),
+                                           parent_rotation(obj), target, axes, offset))
+    for obj, values in zip(objects, new_values):
+        write_rotation(obj, values)
+
+
+def snap_rotations(objects, rotations, step):
+    """Arredonda os ângulos euler de cada rotação para múltiplos de ``step``"""
+    if step <= 0.0:
+        return rotations
+    rotations = rotations.copy()
+    modes = [obj.rotation_mode for obj in objects]
+    euler_rows = np.array([rotation_path(mode) == "rotation_euler" for mode in modes], dtype=bool)
+    rotations[euler_rows, :3] = quantize(rotations[euler_rows, :3], step)
+    for i in np.flatnonzero(~euler_rows):
+        euler = rotation_to_matrix(modes[i], rotations[i]).to_euler('XYZ')
+        snapped = Euler(quantize(np.array(euler), step)).to_matrix()
+        rotations[i] = rotation_from_matrix(modes[i], snapped, rotations[i])
+    return rotations
+
+
+class _StagedTransform:
+    """Cópia de location/rotation/scale editada antes da escrita na cena"""
+    __slots__ = ("location", "rotation_mode", "rotation", "scale")
+
+    def __init__(self, obj):
+        self.location = obj.location.copy()
+        self.rotation_mode = obj.rotation_mode
+        self.rotation = rotation_values(obj)
+        self.scale = obj.scale.copy()
+
+
+@dataclass
+class AlignResult:
+    """Objetos transformados, seus novos valores e a posição final do cursor.
+
+    ``locations`` e ``scales`` são arrays (N, 3) float32 na ordem de ``objects``,
+    ``rotations`` (N, 4) no ``rotation_mode`` de cada objeto (ver
+    ``rotation_values``); ``initial`` guarda os mesmos arrays antes do alinhamento.
+    ``data_offsets`` mapeia cada datablock ao deslocamento local da sua origem
+    (subject "Pivot"); a geometria é deslocada pelo inverso. ``skipped`` lista
+    os objetos cuja origem não pôde ser movida (ver ``keeps_origin``).
+    """
+    objects: list
+    locations: np.ndarray = None
+    rotations: np.ndarray = None
+    scales: np.ndarray = None
+    cursor: Vector = None
+    data_offsets: dict = field(default_factory=dict)
+    skipped: list = field(default_factory=list)
+    initial: tuple = field(default=None, repr=False)
+
+    def deltas(self):
+        """Retorna (d_location, d_rotation, d_scale) em relação ao estado inicial"""
+        loc, rot, scale = self.initial
+        return self.locations - loc, self.rotations - rot, self.scales - scale
+
+    def apply(self, cursor=None):
+        """Escreve o resultado na cena (ex.: após aprovar um dry-run)"""
+        for me, offset in self.data_offsets.items():
+            shift_geometry(me, -offset)
+        for obj, loc, rot, scale in zip(self.objects, self.locations, self.rotations, self.scales):
+            obj.location = loc
+            write_rotation(obj, rot)
+            obj.scale = scale
+        if cursor is not None and self.cursor is not None:
+            for i in range(3):
+                cursor[i] = self.cursor[i]
+
+
+# Objetos tratados entre duas pausas de ``iter_align_objects``
+ALIGN_CHUNK = 256
+
+
+def needs_cursor(settings):
+    """As opções leem ou movem o cursor 3D (subject "Cursor" ou referência "Cursor")"""
+    return settings.subject == "2" or settings.ref2 == "4"
+
+
+def _check_cursor(settings, cursor):
+    if cursor is None and needs_cursor(settings):
+        raise ValueError("These settings align to the 3D cursor; pass its location as cursor")
+
+
+def align_objects(objects, active, settings, cursor=None, dry_run=False,
+                  ref_points_table=None):
+    """Alinha ``objects`` ao ``active`` sem depender do contexto.
+
+    Não altera seleção nem empilha undo, podendo ser chamada em loop a partir de
+    scripts. ``cursor`` é a localização do cursor 3D (ex.: ``scene.cursor.location``),
+    lida pela referência "Cursor" e modificada in-place quando ``subject`` é "2".
+    Com ``dry_run=True`` nada é escrito na cena: apenas o ``AlignResult`` é calculado.
+    ``ref_points_table`` ((objeto, espaço) -> ref points) pode ser compartilhada
+    entre chamadas que enxergam a mesma cena. Sem ``cursor``, opções que dependem
+    dele levantam ``ValueError``.
+    """
+    _check_cursor(settings, cursor)
+    steps = iter_align_objects(objects, active, settings, cursor, ref_points_table)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            result = stop.value
+            break
+
+    if not dry_run:
+        result.apply(cursor if settings.subject == "2" else None)
+    return result
+
+
+def iter_align_objects(objects, active, settings, cursor=None, ref_points_table=None):
+    """Gerador do cálculo de ``align_objects`` (sempre dry-run).
+
+    Pausa a cada ``ALIGN_CHUNK`` objetos, produzindo a fração já tratada, e
+    retorna o ``AlignResult`` no ``StopIteration``. Permite fatiar seleções
+    enormes sem congelar a interface.
+    """
+    _check_cursor(settings, cursor)
+    sel_obj = list(objects)
+    act_obj = active
+
+    if cursor is None:
+        cursor = Vector((0.0, 0.0, 0.0))  # não é lido: ver ``needs_cursor``
+
+    if act_obj is None or not sel_obj:
+        empty = pack_vectors([])
+        return AlignResult(objects=[], locations=empty, rotations=pack_rotations([]),
+                           scales=empty, cursor=Vector(cursor),
+                           initial=(empty, pack_rotations([]), empty))
+
+    # Bounds de coleções/nodes instanciados: uma passada pelo depsgraph
+    count = len(sel_obj)
+    instancers = [act_obj] if has_instances(act_obj) else []
+    for i, obj in enumerate(sel_obj):
+        if i % ALIGN_CHUNK == ALIGN_CHUNK - 1:
+            yield 0.0
+        if has_instances(obj):
+            instancers.append(obj)
+    bounds_cache.prepare_instances(instancers)
+
+    subject = settings.subject
+    active_too = settings.active_too
+    consistent = settings.consistent
+    self_or_active = settings.self_or_active
+    loc_x, loc_y, loc_z = settings.loc_x, settings.loc_y, settings.loc_z
+    ref1, ref2 = settings.ref1, settings.ref2
+    loc_offset = Vector(settings.loc_offset)
+    rot_x, rot_y, rot_z = settings.rot_x, settings.rot_y, settings.rot_z
+    rot_offset = tuple(settings.rot_offset)
+    scale_x, scale_y, scale_z = settings.scale_x, settings.scale_y, settings.scale_z
+    scale_offset = tuple(settings.scale_offset)
+    fit_x, fit_y, fit_z = settings.fit_x, settings.fit_y, settings.fit_z
+
+    # Respeita os toggles "Apply"
+    if not settings.apply_rot:
+        rot_x = rot_y = rot_z = False
+    if not settings.apply_scale:
+        scale_x = scale_y = scale_z = False
+    if not settings.apply_dim:
+        fit_x = fit_y = fit_z = False
+    snap = settings.snap
+
+    # Todas as escritas vão para cópias; a cena só é tocada no final
+    staged = {}
+    new_cursor = Vector(cursor)
+    data_offsets = {}  # datablock -> deslocamento local da origem
+    owners = {}
+    origin_moves = {}  # objeto -> deslocamento mundial da sua origem
+    skipped = []
+
+    def stage(obj):
+        st = staged.get(obj)
+        if st is None:
+            st = staged[obj] = _StagedTransform(obj)
+        return st
+
+    # ---------------- Helpers ---------------- #
+
+    # matrix_world só é atualizada no próximo depsgraph update, então os
+    # pontos de referência de cada objeto valem durante toda a chamada.
+    ref_points_cache = ref_points_table if ref_points_table is not None else {}
+
+    def ref_points_of(obj, space="global"):
+        key = (obj, space)
+        ref_points = ref_points_cache.get(key)
+        if ref_points is None:
+            ref_points = ref_points_cache[key] = get_reference_points(obj, space)
+        return ref_points
+
+    def find_ref2_co(target_obj):
+        """Coordenada de destino (Min/Center/Pivot/Max/Cursor) do ativo"""
+        if ref2 == "4":
+            return Vector(cursor)
+
+        ref_points = ref_points_of(target_obj)
+
+        if ref2 == "0":  # Min
+            return Vector((ref_points[0], ref_points[3], ref_points[6]))
+        elif ref2 == "1":  # Center
+            return Vector((ref_points[1], ref_points[4], ref_points[7]))
+        elif ref2 == "2":  # Pivot
+            return target_obj.matrix_world.translation.copy()
+        elif ref2 == "3":  # Max
+            return Vector((ref_points[2], ref_points[5], ref_points[8]))
+        else:
+            return target_obj.matrix_world.translation.copy()
+
+    # Rotações mundiais do ativo por ordem de euler e espaços dos pais
+    act_rotations = {}
+    parent_rotations = {}
+
+    def parent_rot(obj):
+        if obj not in parent_rotations:
+            parent_rotations[obj] = parent_rotation(obj)
+        return parent_rotations[obj]
+
+    def find_new_rotation(obj):
+        st = stage(obj)
+        order = st.rotation_mode if rotation_path(st.rotation_mode) == "rotation_euler" else 'XYZ'
+        act = staged.get(act_obj)
+        key = (order, act.rotation if act is not None else None)
+        target = act_rotations.get(key)
+        if target is None:
+            target = act_rotations[key] = target_rotation(
+                act_obj, order, act.rotation if act is not None else None)
+        st.rotation = aligned_rotation(st.rotation_mode, st.rotation, parent_rot(obj),
+                                       target, (rot_x, rot_y, rot_z), rot_offset)
+
+    def find_new_scale(obj):
+        st, act = stage(obj), staged.get(act_obj, act_obj)
+        if scale_x:
+            st.scale.x = act.scale.x + scale_offset[0]
+        if scale_y:
+            st.scale.y = act.scale.y + scale_offset[1]
+        if scale_z:
+            st.scale.z = act.scale.z + scale_offset[2]
+
+    def find_new_dimensions(obj, ref_dim):
+        """Ref_dim = dimensão alvo (Vector) do ativo"""
+        ref_points = ref_points_of(obj, "local")
+        dim = Vector((
+            ref_points[2] - ref_points[0],
+            ref_points[5] - ref_points[3],
+            ref_points[8] - ref_points[6],
+        ))
+
+        ratio_x = dim.x / ref_dim.x if ref_dim.x != 0 else 1.0
+        ratio_y = dim.y / ref_dim.y if ref_dim.y != 0 else 1.0
+        ratio_z = dim.z / ref_dim.z if ref_dim.z != 0 else 1.0
+
+        dx = Vector((0.0, 0.0, 0.0))
+        dy = Vector((0.0, 0.0, 0.0))
+        dz = Vector((0.0, 0.0, 0.0))
+
+        if fit_x and ratio_x != 0:
+            dx = ((1.0 - ratio_x) * 0.5) * dim
+        if fit_y and ratio_y != 0:
+            dy = ((1.0 - ratio_y) * 0.5) * dim
+        if fit_z and ratio_z != 0:
+            dz = ((1.0 - ratio_z) * 0.5) * dim
+
+        st = stage(obj)
+        st.location += dx + dy + dz
+
+        if fit_x and ratio_x != 0:
+            st.scale.x *= 1.0 / ratio_x
+        if fit_y and ratio_y != 0:
+            st.scale.y *= 1.0 / ratio_y
+        if fit_z and ratio_z != 0:
+            st.scale.z *= 1.0 / ratio_z
+
+    def find_new_coord(obj, ref2_co):
+        """Alinha o objeto ao ref2_co, usando Min/Center/Pivot/Max + offset"""
+        ref_points = ref_points_of(obj)
+        obj_min = Vector((ref_points[0], ref_points[3], ref_points[6]))
+        obj_max = Vector((ref_points[2], ref_points[5], ref_points[8]))
+        obj_center = (obj_min + obj_max) * 0.5
+        obj_pivot = obj.matrix_world.translation.copy()
+
+        if ref1 == "0":
+            source = obj_min + loc_offset
+        elif ref1 == "1":
+            source = obj_center + loc_offset
+        elif ref1 == "2":
+            source = obj_pivot + loc_offset
+        elif ref1 == "3":
+            source = obj_max + loc_offset
+        else:
+            source = obj_pivot + loc_offset
+
+        translate = ref2_co - source
+        d_world = Vector((
+            translate.x if loc_x else 0.0,
+            translate.y if loc_y else 0.0,
+            translate.z if loc_z else 0.0,
+        ))
+        # translate é mundial; filhos (pai girado/escalado) recebem no espaço do pai
+        stage(obj).location += world_to_location_delta(obj, d_world)
+
+    def relocate_origin(obj, target_co):
+        origin = obj.matrix_world.translation
+        d_world = Vector((
+            target_co.x - origin.x if loc_x else 0.0,
+            target_co.y - origin.y if loc_y else 0.0,
+            target_co.z - origin.z if loc_z else 0.0,
+        ))
+        me = getattr(obj, "data", None)
+
+        if keeps_origin(obj):
+            skipped.append(obj)
+            return
+
+        if not can_shift_geometry(obj):
+            # Sem geometria (empty, luz, câmera...) a origem é o próprio objeto
+            stage(obj).location += world_to_location_delta(obj, d_world)
+            origin_moves[obj] = d_world
+            return
+
+        if me in data_offsets:
+            # Já deslocado por outro usuário; este só é compensado
+            return
+
+        mtx = obj.matrix_world.to_3x3()
+        if abs(mtx.determinant()) < 1e-12:
+            return
+        data_offsets[me] = mtx.inverted() @ d_world
+        owners[me] = obj
+
+    def align_single(obj, ref2_co, act_dim):
+        if rot_x or rot_y or rot_z:
+            find_new_rotation(obj)
+
+        if fit_x or fit_y or fit_z:
+            find_new_dimensions(obj, act_dim)
+
+        if scale_x or scale_y or scale_z:
+            find_new_scale(obj)
+
+        if loc_x or loc_y or loc_z:
+            find_new_coord(obj, ref2_co)
+
+        stage(obj)
+
+    # ---------------- Lógica principal ---------------- #
+
+    if subject == "0":  # Objects
+        ref2_co = find_ref2_co(act_obj)
+
+        if consistent:
+            # Move a seleção como bloco
+            ref_co = point_in_selection(act_obj, sel_obj)
+            sel_min, sel_max = get_sel_ref(ref_co, sel_obj, ref_points_of)
+            sel_center = sel_min + (sel_max - sel_min) * 0.5
+
+            if ref1 == "0":
+                translate = ref2_co - (sel_min + loc_offset)
+            elif ref1 == "1":
+                translate = ref2_co - (sel_center + loc_offset)
+            elif ref1 == "3":
+                translate = ref2_co - (sel_max + loc_offset)
+            else:
+                translate = ref2_co - (sel_center + loc_offset)
+
+            d_world = Vector((
+                translate.x if loc_x else 0.0,
+                translate.y if loc_y else 0.0,
+                translate.z if loc_z else 0.0,
+            ))
+            for i, obj in enumerate(sel_obj):
+                if i % ALIGN_CHUNK == ALIGN_CHUNK - 1:
+                    yield 0.5 * i / count
+                if obj != act_obj or (active_too and obj == act_obj):
+                    stage(obj).location += world_to_location_delta(obj, d_world)
+
+        else:
+            # Dimensão do ativo é calculada uma vez só, antes de qualquer escrita
+            act_dim = None
+            if fit_x or fit_y or fit_z:
+                ref_points = ref_points_of(act_obj, "local")
+                act_dim = Vector((
+                    ref_points[2] - ref_points[0],
+                    ref_points[5] - ref_points[3],
+                    ref_points[8] - ref_points[6],
+                ))
+
+            # Trata objeto a objeto
+            for i, obj in enumerate(sel_obj):
+                if i % ALIGN_CHUNK == ALIGN_CHUNK - 1:
+                    yield 0.5 * i / count
+                if obj == act_obj:
+                    continue
+                align_single(obj, ref2_co, act_dim)
+
+            if active_too:
+                align_single(act_obj, ref2_co, act_dim)
+
+    elif subject == "1":  # Pivot: move a origem, a geometria fica no lugar
+        ref2_co = find_ref2_co(act_obj)
+        if snap:
+            ref2_co = Vector(quantize(np.array(ref2_co), settings.snap_location))
+
+        for i, obj in enumerate(sel_obj):
+            if i % ALIGN_CHUNK == ALIGN_CHUNK - 1:
+                yield 0.5 * i / count
+            if obj != act_obj or active_too:
+                relocate_origin(obj, ref2_co)
+
+    elif subject == "2":  # Cursor
+        def set_cursor_from_vector(target_co):
+            if loc_x:
+                new_cursor.x = target_co.x + loc_offset[0]
+            if loc_y:
+                new_cursor.y = target_co.y + loc_offset[1]
+            if loc_z:
+                new_cursor.z = target_co.z + loc_offset[2]
+
+        if self_or_active in {"0", "1"}:  # Cursor em relação ao ativo
+            ref_points = ref_points_of(act_obj)
+            ref_min = Vector((ref_points[0], ref_points[3], ref_points[6]))
+            ref_max = Vector((ref_points[2], ref_points[5], ref_points[8]))
+            ref_center = (ref_min + ref_max) * 0.5
+            ref_pivot = act_obj.matrix_world.translation.copy()
+
+            if ref2 == "0":  # Min
+                set_cursor_from_vector(ref_min)
+            elif ref2 == "1":  # Center
+                set_cursor_from_vector(ref_center)
+            elif ref2 == "2":  # Pivot
+                set_cursor_from_vector(ref_pivot)
+            elif ref2 == "3":  # Max
+                set_cursor_from_vector(ref_max)
+
+        elif self_or_active == "2":  # Cursor em relação à seleção inteira
+            ref_co = point_in_selection(act_obj, sel_obj)
+            sel_min, sel_max = get_sel_ref(ref_co, sel_obj, ref_points_of)
+            sel_center = sel_min + (sel_max - sel_min) * 0.5
+
+            if ref2 == "0":  # Min
+                set_cursor_from_vector(sel_min)
+            elif ref2 == "1":  # Center
+                set_cursor_from_vector(sel_center)
+            elif ref2 == "2":  # Pivot (usa o centro da seleção)
+                set_cursor_from_vector(sel_center)
+            elif ref2 == "3":  # Max
+                set_cursor_from_vector(sel_max)
+
+    # ---------------- Resultado ---------------- #
+
+    # Dados compartilhados: desloca uma vez e compensa todos os usuários
+    if data_offsets:
+        shared = {me for me in data_offsets if me.users > 1}
+        users = bpy.data.user_map(subset=shared, value_types={'OBJECT'}) if shared else {}
+        for me, offset in data_offsets.items():
+            for user in users.get(me, (owners[me],)):
+                d_world = user.matrix_world.to_3x3() @ offset
+                stage(user).location += world_to_location_delta(user, d_world)
+                origin_moves[user] = d_world
+
+    # Filhos ficam no lugar quando a origem do pai se move (como o Set Origin)
+    for parent, d_world in origin_moves.items():
+        for child in parent.children:
+            stage(child).location -= world_to_location_delta(child, d_world)
+
+    if snap and subject == "0":
+        # Objetos só "limpos" pela grade também entram no resultado
+        for i, obj in enumerate(sel_obj):
+            if i % ALIGN_CHUNK == ALIGN_CHUNK - 1:
+                yield 0.5 * i / count
+            if obj != act_obj or active_too:
+                stage(obj)
+
+    # Arrays do resultado montados em pedaços (seleções enormes)
+    moved = list(staged)
+    total = len(moved)
+    arrays = [np.empty((total, width), dtype=np.float32) for width in (3, 4, 3, 3, 4, 3)]
+    locations, rotations, scales, initial_locations, initial_rotations, initial_scales = arrays
+    for start in range(0, total, ALIGN_CHUNK):
+        chunk = moved[start:start + ALIGN_CHUNK]
+        end = start + len(chunk)
+        stages = [staged[obj] for obj in chunk]
+        locations[start:end] = pack_vectors([st.location for st in stages])
+        rotations[start:end] = [st.rotation for st in stages]
+        scales[start:end] = pack_vectors([st.scale for st in stages])
+        initial_locations[start:end] = pack_vectors([obj.location for obj in chunk])
+        initial_rotations[start:end] = pack_rotations(chunk)
+        initial_scales[start:end] = pack_vectors([obj.scale for obj in chunk])
+        yield 0.5 + 0.5 * end / total
+
+    result = AlignResult(
+        objects=moved,
+        locations=locations,
+        rotations=rotations,
+        scales=scales,
+        cursor=new_cursor,
+        data_offsets=data_offsets,
+        skipped=skipped,
+        initial=(initial_locations, initial_rotations, initial_scales),
+    )
+
+    if snap:
+        if subject == "2":
+            result.cursor = Vector(quantize(np.array(new_cursor), settings.snap_location))
+        elif subject == "0":
+            # Rotação e escala primeiro: a referência é medida já com elas
+            snap_transforms(result, settings)
+            yield from snap_locations(result, settings)
+
+    return result
+
+
+def align_function(context,
+                   subject, active_too, consistent, self_or_active,
+                   loc_x, loc_y, loc_z, ref1, ref2, loc_offset,
+                   rot_x, rot_y, rot_z, rot_offset, apply_rot,
+                   scale_x, scale_y, scale_z, scale_offset, apply_scale,
+                   fit_x, fit_y, fit_z, apply_dim):
+    """Versão ligada ao contexto (seleção, ativo e cursor da cena)"""
+    settings = AlignSettings(
+        subject=subject, active_too=active_too, consistent=consistent,
+        self_or_active=self_or_active,
+        loc_x=loc_x, loc_y=loc_y, loc_z=loc_z, ref1=ref1, ref2=ref2,
+        loc_offset=loc_offset,
+        rot_x=rot_x, rot_y=rot_y, rot_z=rot_z, rot_offset=rot_offset,
+        apply_rot=apply_rot,
+        scale_x=scale_x, scale_y=scale_y, scale_z=scale_z,
+        scale_offset=scale_offset, apply_scale=apply_scale,
+        fit_x=fit_x, fit_y=fit_y, fit_z=fit_z, apply_dim=apply_dim,
+    )
+    return align_objects(context.selected_objects, context.active_object,
+                         settings, context.scene.cursor.location)
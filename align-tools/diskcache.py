@@ -0,0 +1,181 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import hashlib
+import os
+
+import numpy as np
+
+from .host import bpy
+
+
+# ------------------------------------------------------------------------
+# Library Bounds Store
+# ------------------------------------------------------------------------
+
+_MAGIC = b"ALBC"
+_VERSION = 2  # 2: fechos refeitos após a correção de extremos coplanares
+_HEADER = np.dtype([("magic", "S4"), ("version", "<u4"), ("entries", "<u8"), ("points", "<u8"),
+                    ("pad", "V8")])
+_ENTRY = np.dtype([
+    ("key", "S20"),            # blake2b(biblioteca + nome do datablock)
+    ("hash", "S16"),           # hash do conteúdo da geometria
+    ("ref_points", "<f8", (9,)),
+    ("start", "<u8"),          # primeira linha do fecho em ``hull``
+    ("count", "<u8"),
+])
+
+
+def library_key(library_path, name):
+    """Chave estável de um datablock linkado entre sessões"""
+    path = bpy.path.abspath(library_path)
+    text = "{}\0{}".format(os.path.normcase(os.path.normpath(path)), name)
+    return hashlib.blake2b(text.encode("utf-8", "surrogateescape"), digest_size=20).digest()
+
+
+def _aligned(offset):
+    return (offset + 7) & ~7
+
+
+class LibraryBoundsStore:
+    """Resumos locais (AABB e fecho) de geometria linkada, persistidos em disco.
+
+    Tudo fica num único arquivo lido por memory map: o índice é carregado uma
+    vez por sessão e os pontos do fecho só são paginados quando usados.
+    Entradas novas ficam pendentes até ``flush``, que reescreve o arquivo de
+    forma atômica.
+    """
+
+    filename = "library_bounds.bin"
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._index = None   # chave -> (hash, ref_points, start, count)
+        self._hull = None    # memmap (M, 3) float64
+        self._pending = {}   # chave -> (hash, ref_points, hull)
+
+    @property
+    def path(self):
+        directory = self.directory
+        if directory is None:
+            directory = bpy.utils.user_resource('DATAFILES', path="align_tools", create=True)
+        return os.path.join(directory, self.filename)
+
+    def _read(self, path):
+        """(índice estruturado, pontos) do arquivo, ou None se ausente/inválido"""
+        try:
+            mm = np.memmap(path, dtype=np.uint8, mode="r")
+        except (OSError, ValueError):
+            return None
+        if len(mm) < _HEADER.itemsize:
+            return None
+        header = mm[:_HEADER.itemsize].view(_HEADER)[0]
+        if header["magic"] != _MAGIC or header["version"] != _VERSION:
+            return None
+
+        entries, points = int(header["entries"]), int(header["points"])
+        start = _HEADER.itemsize
+        hull_start = _aligned(start + entries * _ENTRY.itemsize)
+        if len(mm) != hull_start + points * 24:
+            return None
+        index = mm[start:start + entries * _ENTRY.itemsize].view(_ENTRY)
+        hull = mm[hull_start:].view("<f8").reshape(-1, 3)
+        return index, hull
+
+    def _load(self):
+        if self._index is not None:
+            return
+        self._index = {}
+        data = self._read(self.path)
+        if data is None:
+            return
+        index, self._hull = data
+        for row in index:
+            self._index[bytes(row["key"])] = (
+                bytes(row["hash"]), [float(v) for v in row["ref_points"]],
+                int(row["start"]), int(row["count"]))
+
+    def get(self, key, digest):
+        """(ref_points, fecho) guardados para ``key`` se o conteúdo bate, senão None"""
+        pending = self._pending.get(key)
+        if pending is not None:
+            return (pending[1], pending[2]) if pending[0] == digest else None
+
+        self._load()
+        entry = self._index.get(key)
+        if entry is None or entry[0] != digest:
+            return None
+        _, ref_points, start, count = entry
+        # Cópias: nada fora do store segura o memory map (``flush`` o substitui)
+        return list(ref_points), np.array(self._hull[start:start + count])
+
+    def put(self, key, digest, ref_points, hull):
+        self._pending[key] = (digest, list(ref_points), np.asarray(hull, dtype=np.float64))
+
+    def flush(self):
+        """Grava as entradas pendentes junto com as que já estão no arquivo"""
+        if not self._pending:
+            return
+        path = self.path
+
+        # Relê o arquivo: outra sessão pode ter gravado nesse meio tempo
+        rows, hulls = [], []
+        old = self._read(path)
+        if old is not None:
+            old_index, old_hull = old
+            for row in old_index:
+                key = bytes(row["key"])
+                if key in self._pending:
+                    continue
+                start, count = int(row["start"]), int(row["count"])
+                rows.append((key, bytes(row["hash"]), np.array(row["ref_points"])))
+                hulls.append(np.array(old_hull[start:start + count]))
+        for key, (digest, ref_points, hull) in self._pending.items():
+            rows.append((key, digest, ref_points))
+            hulls.append(hull)
+
+        counts = [len(hull) for hull in hulls]
+        index = np.zeros(len(rows), dtype=_ENTRY)
+        index["key"] = [row[0] for row in rows]
+        index["hash"] = [row[1] for row in rows]
+        index["ref_points"] = [row[2] for row in rows]
+        index["count"] = counts
+        index["start"] = np.cumsum([0] + counts[:-1]) if counts else []
+
+        header = np.zeros(1, dtype=_HEADER)
+        header["magic"] = _MAGIC
+        header["version"] = _VERSION
+        header["entries"] = len(rows)
+        header["points"] = sum(counts)
+        pad = _aligned(_HEADER.itemsize + index.nbytes) - (_HEADER.itemsize + index.nbytes)
+
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(header.tobytes())
+                f.write(index.tobytes())
+                f.write(b"\0" * pad)
+                for hull in hulls:
+                    f.write(np.ascontiguousarray(hull, dtype="<f8").tobytes())
+            # Nenhuma view do arquivo antigo pode continuar mapeada
+            old = old_index = old_hull = None
+            self.close()
+            os.replace(tmp, path)
+        except OSError as ex:
+            # Ex.: arquivo ainda mapeado no Windows; tenta de novo no próximo flush
+            print("Align Tools: could not write the library bounds cache:", ex)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        self._pending.clear()
+
+    def close(self):
+        """Solta o memory map; o índice é relido no próximo acesso"""
+        self._index = None
+        self._hull = None
+
+
+library_store = LibraryBoundsStore()
@@ -0,0 +1,185 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+
+from .bounds import (
+    bounds_cache,
+    get_reference_points,
+)
+from .host import bpy
+
+
+# ------------------------------------------------------------------------
+# Selection Extents
+# ------------------------------------------------------------------------
+
+def extents_from_ref_points(ref_points):
+    """Ref points -> (min, center, max, dimensões) como tuplas"""
+    e_min = (ref_points[0], ref_points[3], ref_points[6])
+    e_center = (ref_points[1], ref_points[4], ref_points[7])
+    e_max = (ref_points[2], ref_points[5], ref_points[8])
+    dim = (e_max[0] - e_min[0], e_max[1] - e_min[1], e_max[2] - e_min[2])
+    return e_min, e_center, e_max, dim
+
+
+# Índices dos ref points que definem cada limite: (minX, maxX, minY, maxY, minZ, maxZ)
+_LIMIT_INDICES = (0, 2, 3, 5, 6, 8)
+
+
+class SelectionExtents:
+    """Extents do ativo e da seleção, mantidos pelo handler de depsgraph.
+
+    Só os objetos reportados como alterados são relidos e os limites da
+    seleção são estendidos no lugar; a seleção inteira só é percorrida quando
+    ela muda ou quando o objeto que definia um limite recua. O painel apenas
+    lê ``active`` e ``selection`` já calculados.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.bounds = {}  # nome do objeto -> ref points globais
+        self.selected = frozenset()
+        self.active_name = None
+        self.active = None
+        self.selection = None
+        self.limits = None  # [minX, maxX, minY, maxY, minZ, maxZ] da seleção
+        self.owners = None  # nome do objeto que define cada limite
+        self.dirty = True
+
+    def update(self, view_layer, updated=None, rescan=True, depsgraph=None):
+        """Atualiza o cache; ``updated`` = nomes alterados (None relê tudo).
+
+        ``rescan=False`` confia que seleção e ativo não mudaram e só relê os
+        objetos alterados. ``depsgraph`` é o do handler, usado nas instâncias.
+        """
+        if updated is None:
+            self.bounds.clear()
+            updated = ()
+            rescan = True
+        if rescan or self.dirty:
+            return self._rescan(view_layer, updated, depsgraph)
+        return self._move(updated, depsgraph)
+
+    def _rescan(self, view_layer, updated, depsgraph):
+        objects = view_layer.objects
+        act_obj = objects.active
+        sel_obj = list(objects.selected)
+
+        selected = frozenset(o.name for o in sel_obj)
+        active_name = act_obj.name if act_obj is not None else None
+        for name in updated:
+            self.bounds.pop(name, None)
+
+        wanted = sel_obj + [act_obj] if act_obj is not None else sel_obj
+        wanted = [obj for obj in wanted if obj.name not in self.bounds]
+        if not (wanted or self.dirty or selected != self.selected
+                or active_name != self.active_name):
+            return False
+
+        bounds_cache.prepare_instances(wanted, depsgraph)
+        for obj in wanted:
+            self.bounds[obj.name] = get_reference_points(obj, "global")
+
+        keep = selected | {active_name}
+        for name in [n for n in self.bounds if n not in keep]:
+            del self.bounds[name]
+
+        self.selected = selected
+        self.active_name = active_name
+        self.active = None
+        if active_name is not None:
+            self.active = extents_from_ref_points(self.bounds[active_name])
+        self._recompute_limits()
+        self.dirty = False
+        return True
+
+    def _move(self, updated, depsgraph):
+        names = [name for name in updated
+                 if name in self.selected or name == self.active_name]
+        if not names:
+            return False
+
+        moved = [obj for obj in map(bpy.data.objects.get, names) if obj is not None]
+        if len(moved) != len(names):
+            # Objeto sumiu ou foi renomeado: relê a seleção no próximo acesso
+            self.dirty = True
+            return True
+
+        bounds_cache.prepare_instances(moved, depsgraph)
+        retreated = False
+        for obj in moved:
+            name = obj.name
+            ref_points = self.bounds[name] = get_reference_points(obj, "global")
+            if name == self.active_name:
+                self.active = extents_from_ref_points(ref_points)
+            if name in self.selected and not retreated:
+                retreated = not self._extend(name, ref_points)
+
+        if retreated:
+            self._recompute_limits()
+        else:
+            self._publish()
+        return True
+
+    def _extend(self, name, ref_points):
+        """Estende os limites com ``ref_points``; False se ``name`` definia um
+        limite e recuou (exige recalcular)"""
+        limits, owners = self.limits, self.owners
+        if limits is None:
+            return False
+        for i, index in enumerate(_LIMIT_INDICES):
+            value = ref_points[index]
+            if value < limits[i] if i % 2 == 0 else value > limits[i]:
+                limits[i] = value
+                owners[i] = name
+            elif owners[i] == name and value != limits[i]:
+                return False
+        return True
+
+    def _recompute_limits(self):
+        self.limits = self.owners = None
+        for name in self.selected:
+            ref_points = self.bounds[name]
+            if self.limits is None:
+                self.limits = [ref_points[i] for i in _LIMIT_INDICES]
+                self.owners = [name] * 6
+            else:
+                self._extend(name, ref_points)
+        self._publish()
+
+    def _publish(self):
+        if self.limits is None:
+            self.selection = None
+            return
+        min_x, max_x, min_y, max_y, min_z, max_z = self.limits
+        self.selection = extents_from_ref_points([
+            min_x, (min_x + max_x) * 0.5, max_x,
+            min_y, (min_y + max_y) * 0.5, max_y,
+            min_z, (min_z + max_z) * 0.5, max_z,
+        ])
+
+
+selection_extents = SelectionExtents()
+
+
+def depsgraph_update(view_layer, depsgraph=None):
+    """Invalida o que mudou de geometria e atualiza os extents da seleção"""
+    if depsgraph is None:
+        bounds_cache.clear()
+        selection_extents.update(view_layer)
+        return
+
+    moved, instancers = bounds_cache.apply_updates(depsgraph.updates)
+    updated = {obj.name for obj in moved} | instancers
+    known = selection_extents.bounds
+    new_selected = any(obj.name not in known and obj.select_get(view_layer=view_layer)
+                       for obj in moved)
+
+    # Seleção e ativo não geram updates de transformação: sem nenhum objeto
+    # alterado a lista da seleção pode ter mudado e é relida. Objetos novos
+    # já selecionados (duplicar, adicionar) também forçam a releitura.
+    rescan = new_selected or not moved
+    selection_extents.update(view_layer, updated, rescan, depsgraph)
@@ -0,0 +1,157 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+from fnmatch import fnmatchcase
+import re
+
+import numpy as np
+
+from .bounds import bounds_cache
+from .core import AlignResult, align_objects
+
+
+# ------------------------------------------------------------------------
+# Grouped Alignment
+# ------------------------------------------------------------------------
+
+DEFAULT_TARGET_PATTERN = "*_target"
+# "Chair", "Chair.001" e "Chair_target" caem no grupo "Chair"
+DEFAULT_KEY_PATTERN = r"^(.*?)(?:_target)?(?:\.\d+)?$"
+
+
+def _group_key(obj, mode, key_regex):
+    if mode == "PARENT":
+        return obj.parent
+    if mode == "COLLECTION":
+        collections = obj.users_collection
+        return collections[0] if collections else None
+    if mode == "NAME":
+        match = key_regex.match(obj.name)
+        if match is None:
+            return None
+        return match.group(1) if key_regex.groups else match.group(0)
+    raise ValueError("Unknown grouping mode: {!r}".format(mode))
+
+
+def group_targets(objects, mode, target_pattern=DEFAULT_TARGET_PATTERN,
+                  key_pattern=DEFAULT_KEY_PATTERN, active=None):
+    """Divide ``objects`` em grupos e retorna [(alvo, membros)] na ordem da seleção.
+
+    ``mode`` é "PARENT" (o alvo é o pai), "COLLECTION" (primeira coleção do
+    objeto) ou "NAME" (chave = primeiro grupo de ``key_pattern``). Nos dois
+    últimos o alvo é o membro cujo nome casa com ``target_pattern``; sem ele o
+    ``active`` serve de alvo se estiver no grupo, senão o grupo é ignorado.
+    """
+    key_regex = re.compile(key_pattern) if mode == "NAME" else None
+    buckets = {}
+    for obj in objects:
+        key = _group_key(obj, mode, key_regex)
+        if key is not None:
+            buckets.setdefault(key, []).append(obj)
+
+    groups = []
+    for key, members in buckets.items():
+        if mode == "PARENT":
+            target = key
+        else:
+            target = next((obj for obj in members if fnmatchcase(obj.name, target_pattern)), None)
+            if target is None and active in members:
+                target = active
+            if target is None:
+                continue
+        members = [obj for obj in members if obj is not target]
+        if members:
+            groups.append((target, members))
+    return groups
+
+
+def check_overlap(groups, settings):
+    """Levanta ``ValueError`` se algum objeto seria alinhado por mais de um grupo
+    (membro de dois grupos, ou alvo com ``active_too`` e membro de outro)"""
+    owner = {}
+    conflicts = []
+    for n, (target, members) in enumerate(groups):
+        moved = list(members)
+        if settings.active_too:
+            moved.append(target)
+        for obj in moved:
+            if owner.setdefault(obj, n) != n and obj not in conflicts:
+                conflicts.append(obj)
+    if conflicts:
+        names = ", ".join(obj.name for obj in conflicts[:3])
+        if len(conflicts) > 3:
+            names += ", ..."
+        raise ValueError("Objects belong to more than one group: {}".format(names))
+
+
+def merge_results(results):
+    """Junta os ``AlignResult`` dos grupos (sem membros em comum, ver
+    ``check_overlap``); objetos só compensados, como filhos e outros usuários de
+    um datablock deslocado, ficam com o primeiro grupo que os moveu"""
+    keep_rows = []
+    objects = []
+    data_offsets = {}
+    skipped = []
+    seen = set()
+    for result in results:
+        skipped.extend(obj for obj in result.skipped if obj not in skipped)
+        rows = []
+        for i, obj in enumerate(result.objects):
+            if obj not in seen:
+                seen.add(obj)
+                objects.append(obj)
+                rows.append(i)
+        keep_rows.append(rows)
+        for me, offset in result.data_offsets.items():
+            data_offsets.setdefault(me, offset)
+
+    def stack(arrays, width):
+        parts = [array[rows] for array, rows in zip(arrays, keep_rows)]
+        if not parts:
+            return np.zeros((0, width), dtype=np.float32)
+        return np.concatenate(parts).astype(np.float32, copy=False)
+
+    initial = [result.initial for result in results]
+    return AlignResult(
+        objects=objects,
+        locations=stack([result.locations for result in results], 3),
+        rotations=stack([result.rotations for result in results], 4),
+        scales=stack([result.scales for result in results], 3),
+        data_offsets=data_offsets,
+        skipped=skipped,
+        initial=(
+            stack([loc for loc, _, _ in initial], 3),
+            stack([rot for _, rot, _ in initial], 4),
+            stack([scale for _, _, scale in initial], 3),
+        ),
+    )
+
+
+def align_groups(groups, settings, cursor=None, dry_run=False):
+    """Alinha cada grupo de ``group_targets`` ao seu alvo numa única passada.
+
+    Todos os grupos são resolvidos sobre o estado atual da cena, com uma só
+    tabela de pontos de referência, e escritos de uma vez no final (um único
+    passo de undo no operador). Filhos acompanham pais movidos por outro grupo.
+    """
+    if settings.subject == "2":
+        raise ValueError("Grouped alignment moves objects or origins, not the cursor")
+    check_overlap(groups, settings)
+
+    objects = []
+    for target, members in groups:
+        objects.append(target)
+        objects.extend(members)
+    bounds_cache.prepare_instances(objects)
+
+    ref_points_table = {}
+    results = [
+        align_objects(members, target, settings, cursor, dry_run=True,
+                      ref_points_table=ref_points_table)
+        for target, members in groups
+    ]
+    result = merge_results(results)
+    if not dry_run:
+        result.apply()
+    return result
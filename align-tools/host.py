@@ -0,0 +1,16 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+# ------------------------------------------------------------------------
+# Host
+# ------------------------------------------------------------------------
+
+# Único ponto em que o engine depende de ``bpy``. Fora do Blender (CI,
+# benchmarks) o stand-in de standin.py ocupa o lugar do módulo, inclusive em
+# ``sys.modules``, para que a camada de UI também possa ser importada.
+try:
+    import bpy
+except ImportError:
+    from . import standin as bpy
+    bpy.install()
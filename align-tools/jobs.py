@@ -0,0 +1,108 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import time
+
+from .bounds import bounds_cache, get_reference_points
+from .core import (
+    iter_align_objects,
+    shift_geometry,
+    write_rotation,
+)
+
+
+# ------------------------------------------------------------------------
+# Chunked Execution
+# ------------------------------------------------------------------------
+
+class AlignJob:
+    """Executa ``align_objects`` em fatias de tempo, com progresso e rollback.
+
+    A leitura de bounds (parte pesada), o cálculo e a escrita na cena são
+    feitos em pedaços dentro de ``step``; ``rollback`` desfaz o que já foi
+    escrito.
+    """
+
+    def __init__(self, objects, active, settings, cursor):
+        self.objects = list(objects)
+        self.active = active
+        self.settings = settings
+        self.cursor = cursor
+        self.result = None
+        self.progress = 0.0
+        self._written = 0
+        self._shifted = []
+        self._steps = self._run()
+
+    def _run(self):
+        objects = self.objects
+        count = len(objects) or 1
+        local = self.settings.apply_dim
+
+        # Aquece o cache de bounds, que é o que domina o custo; as instâncias
+        # saem de uma só passada pelo depsgraph
+        bounds_cache.prepare_instances(objects)
+        yield
+        for i, obj in enumerate(objects):
+            get_reference_points(obj, "global")
+            if local:
+                get_reference_points(obj, "local")
+            self.progress = 0.4 * (i + 1) / count
+            yield
+
+        # O cálculo também é fatiado: pausa a cada ALIGN_CHUNK objetos
+        steps = iter_align_objects(objects, self.active, self.settings, self.cursor)
+        while True:
+            try:
+                done = next(steps)
+            except StopIteration as stop:
+                self.result = result = stop.value
+                break
+            self.progress = 0.4 + 0.2 * done
+            yield
+        yield
+
+        for me, offset in result.data_offsets.items():
+            shift_geometry(me, -offset)
+            self._shifted.append((me, offset))
+            yield
+
+        total = len(result.objects) or 1
+        for i, obj in enumerate(result.objects):
+            obj.location = result.locations[i]
+            write_rotation(obj, result.rotations[i])
+            obj.scale = result.scales[i]
+            self._written = i + 1
+            self.progress = 0.6 + 0.4 * (i + 1) / total
+            yield
+
+        if self.settings.subject == "2":
+            for i in range(3):
+                self.cursor[i] = result.cursor[i]
+        self.progress = 1.0
+
+    def step(self, budget=0.02):
+        """Avança por até ``budget`` segundos; retorna True ao terminar"""
+        deadline = time.perf_counter() + budget
+        for _ in self._steps:
+            if time.perf_counter() >= deadline:
+                return False
+        return True
+
+    def rollback(self):
+        """Restaura as transformações e a geometria já alteradas"""
+        self._steps.close()
+        result = self.result
+        if result is None:
+            return
+        loc, rot, scale = result.initial
+        for i in range(self._written):
+            obj = result.objects[i]
+            obj.location = loc[i]
+            write_rotation(obj, rot[i])
+            obj.scale = scale[i]
+        for me, offset in reversed(self._shifted):
+            shift_geometry(me, offset)
+        self._written = 0
+        self._shifted.clear()
@@ -0,0 +1,156 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import math
+
+from mathutils import Vector
+import numpy as np
+
+from .bounds import bounds_cache, get_reference_points
+from .core import (
+    AlignResult,
+    pack_rotations,
+    pack_vectors,
+    world_to_location_delta,
+)
+
+
+# ------------------------------------------------------------------------
+# Grid Layout
+# ------------------------------------------------------------------------
+
+AXIS_INDEX = {"X": 0, "Y": 1, "Z": 2}
+
+# Plano -> (eixo horizontal, eixo vertical, normal)
+PLANE_AXES = {
+    "XY": (0, 1, 2),
+    "XZ": (0, 2, 1),
+    "YZ": (1, 2, 0),
+}
+
+
+def shelf_pack(widths, heights, padding, max_width=None):
+    """Canto mínimo (x, y) de cada item, na ordem dada, em prateleiras (Next-Fit).
+
+    Sem ``max_width`` a largura alvo é a raiz da área total, para um layout
+    aproximadamente quadrado.
+    """
+    count = len(widths)
+    xs = np.zeros(count)
+    ys = np.zeros(count)
+    if count == 0:
+        return xs, ys
+
+    if max_width is None:
+        area = float(((widths + padding) * (heights + padding)).sum())
+        max_width = max(math.sqrt(area), float(widths.max()))
+
+    x = y = shelf_height = 0.0
+    for i, (w, h) in enumerate(zip(widths.tolist(), heights.tolist())):
+        if x > 0.0 and x + w > max_width:
+            y += shelf_height + padding
+            x = shelf_height = 0.0
+        xs[i] = x
+        ys[i] = y
+        x += w + padding
+        if h > shelf_height:
+            shelf_height = h
+
+    return xs, ys
+
+
+def arrange_grid(objects, origin, plane="XY", padding=0.1, sort_key="SIZE", dry_run=False):
+    """Empacota ``objects`` em prateleiras no ``plane``, a partir de ``origin``.
+
+    ``sort_key``: "SIZE" (maiores primeiro), "NAME" ou "TYPE". Os objetos ficam
+    apoiados no plano (mínimo da normal em ``origin``). Retorna um ``AlignResult``;
+    a cena é escrita numa única passada, a menos que ``dry_run`` seja True.
+    """
+    objects = list(objects)
+    u, v, n = PLANE_AXES[plane]
+
+    bounds_cache.prepare_instances(objects)
+    bounds = np.array([get_reference_points(obj, "global") for obj in objects]).reshape(-1, 9)
+    mins = bounds[:, [0, 3, 6]]
+    dims = bounds[:, [2, 5, 8]] - mins
+
+    if sort_key == "NAME":
+        order = sorted(range(len(objects)), key=lambda i: objects[i].name)
+    elif sort_key == "TYPE":
+        order = sorted(range(len(objects)), key=lambda i: (objects[i].type, objects[i].name))
+    else:
+        order = np.lexsort((-dims[:, u], -dims[:, v]))
+    order = np.asarray(order, dtype=np.intp)
+
+    xs, ys = shelf_pack(dims[order, u], dims[order, v], padding)
+
+    target = mins.copy()
+    target[order, u] = origin[u] + xs
+    target[order, v] = origin[v] + ys
+    target[:, n] = origin[n]
+    return translate_objects(objects, target - mins, dry_run)
+
+
+def translate_objects(objects, d_world, dry_run=False):
+    """Desloca cada objeto por uma linha de ``d_world`` (N, 3), numa única escrita"""
+    initial = (
+        pack_vectors([obj.location for obj in objects]),
+        pack_rotations(objects),
+        pack_vectors([obj.scale for obj in objects]),
+    )
+    locations = initial[0] + d_world.astype(np.float32)
+    for i, obj in enumerate(objects):
+        if obj.parent is not None:
+            locations[i] = initial[0][i] + world_to_location_delta(obj, Vector(d_world[i]))
+
+    result = AlignResult(
+        objects=objects,
+        locations=locations,
+        rotations=initial[1],
+        scales=initial[2],
+        initial=initial,
+    )
+    if not dry_run:
+        for obj, loc in zip(objects, locations):
+            obj.location = loc
+    return result
+
+
+def stack_objects(objects, active=None, axis="X", gap=0.0, dry_run=False):
+    """Encadeia ``objects`` ponta a ponta ao longo de ``axis`` ("X", "-Y", ...).
+
+    O ``active`` (ou o primeiro ao longo do eixo) fica parado; os demais, na
+    ordem em que já estão no eixo, encostam o mínimo no máximo do anterior mais
+    ``gap``. As posições saem de uma soma de prefixos sobre os extents.
+    """
+    objects = list(objects)
+    sign = -1.0 if axis.startswith("-") else 1.0
+    a = AXIS_INDEX[axis.lstrip("-")]
+
+    bounds_cache.prepare_instances(objects)
+    bounds = np.array([get_reference_points(obj, "global") for obj in objects]).reshape(-1, 9)
+    mins = bounds[:, 3 * a]
+    maxs = bounds[:, 3 * a + 2]
+    d_world = np.zeros((len(objects), 3))
+    if len(objects) < 2:
+        return translate_objects(objects, d_world, dry_run)
+
+    # Ordem atual ao longo do eixo (no sentido pedido)
+    order = np.argsort(sign * (mins + maxs), kind="stable")
+    if active is not None and active in objects:
+        base = objects.index(active)
+        order = np.concatenate([[base], order[order != base]])
+    base, rest = order[0], order[1:]
+
+    sizes = maxs[rest] - mins[rest]
+    steps = np.concatenate([[0.0], np.cumsum(sizes[:-1] + gap)])
+    if sign > 0:
+        target_min = maxs[base] + gap + steps
+        d_world[rest, a] = target_min - mins[rest]
+    else:
+        target_max = mins[base] - gap - steps
+        d_world[rest, a] = target_max - maxs[rest]
+
+    return translate_objects(objects, d_world, dry_run)
+
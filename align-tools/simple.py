@@ -0,0 +1,111 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+from .core import align_rotation
+
+
+# ------------------------------------------------------------------------
+# Simple Align Defs
+# ------------------------------------------------------------------------
+
+def _set_world_translation(obj, translation, axes):
+    # Atribui a matriz inteira: o stand-in devolve a própria matriz avaliada,
+    # e editá-la no lugar não chegaria ao location
+    mtx = obj.matrix_world.copy()
+    for i in axes:
+        mtx[i][3] = translation[i]
+    obj.matrix_world = mtx
+
+
+def LocAll(context):
+    act = context.active_object
+    if act is None:
+        return
+    for obj in context.selected_objects:
+        _set_world_translation(obj, act.matrix_world.translation, (0, 1, 2))
+    align_rotation(context.selected_objects, act)
+
+
+def LocX(context):
+    act = context.active_object
+    if act is None:
+        return
+    for obj in context.selected_objects:
+        _set_world_translation(obj, act.matrix_world.translation, (0,))
+
+
+def LocY(context):
+    act = context.active_object
+    if act is None:
+        return
+    for obj in context.selected_objects:
+        _set_world_translation(obj, act.matrix_world.translation, (1,))
+
+
+def LocZ(context):
+    act = context.active_object
+    if act is None:
+        return
+    for obj in context.selected_objects:
+        _set_world_translation(obj, act.matrix_world.translation, (2,))
+
+
+def RotAll(context):
+    act = context.active_object
+    if act is None:
+        return
+    align_rotation(context.selected_objects, act)
+
+
+def RotX(context):
+    act = context.active_object
+    if act is None:
+        return
+    align_rotation(context.selected_objects, act, axes=(True, False, False))
+
+
+def RotY(context):
+    act = context.active_object
+    if act is None:
+        return
+    align_rotation(context.selected_objects, act, axes=(False, True, False))
+
+
+def RotZ(context):
+    act = context.active_object
+    if act is None:
+        return
+    align_rotation(context.selected_objects, act, axes=(False, False, True))
+
+
+def ScaleAll(context):
+    act = context.active_object
+    if act is None:
+        return
+    for obj in context.selected_objects:
+        obj.scale = act.scale.copy()
+
+
+def ScaleX(context):
+    act = context.active_object
+    if act is None:
+        return
+    for obj in context.selected_objects:
+        obj.scale.x = act.scale.x
+
+
+def ScaleY(context):
+    act = context.active_object
+    if act is None:
+        return
+    for obj in context.selected_objects:
+        obj.scale.y = act.scale.y
+
+
+def ScaleZ(context):
+    act = context.active_object
+    if act is None:
+        return
+    for obj in context.selected_objects:
+        obj.scale.z = act.scale.z
@@ -0,0 +1,758 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Stand-in mínimo de ``bpy`` para rodar o engine em CPython puro.
+
+Modela só o que o alinhamento usa: objetos com location/rotation/scale,
+parent e ``matrix_world``, meshes e curvas (coordenadas em arrays numpy, com
+``foreach_get``/``foreach_set`` em bloco), actions com F-Curves, cena com
+cursor, seleção e objeto ativo. Tipos de operador/painel, ``bpy.props`` e
+handlers existem apenas para que ``__init__`` possa ser importado.
+
+Como no Blender, ``matrix_world`` só é recalculada em ``view_layer.update()``,
+que também entrega as mudanças desde a última avaliação aos handlers de
+``depsgraph_update_post`` (``depsgraph.updates``).
+Fora do Blender, ``mathutils`` vem do pacote homônimo do PyPI::
+
+    from .host import bpy   # o próprio stand-in fora do Blender
+    me = bpy.data.meshes.new("Cube")
+    me.from_pydata([(-1, -1, -1), (1, 1, 1)], [], [])
+    obj = bpy.data.objects.new("Cube", me)
+    bpy.context.scene.collection.objects.link(obj)
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+    bpy.context.view_layer.update()
+"""
+
+import os
+import sys
+import tempfile
+import types as _types
+
+from mathutils import (
+    Euler,
+    Matrix,
+    Quaternion,
+    Vector,
+)
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+# Bulk Collections
+# ------------------------------------------------------------------------
+
+class _PointView:
+    """Elemento de uma ``_PointCollection``; cada atributo é uma cópia (Vector)"""
+    __slots__ = ("_owner", "_index")
+
+    def __init__(self, owner, index):
+        object.__setattr__(self, "_owner", owner)
+        object.__setattr__(self, "_index", index)
+
+    def __getattr__(self, name):
+        try:
+            row = self._owner._arrays[name][self._index]
+        except KeyError:
+            raise AttributeError(name) from None
+        return Vector(row) if len(row) > 1 else float(row[0])
+
+    def __setattr__(self, name, value):
+        self._owner._arrays[name][self._index] = value
+
+
+class _PointCollection:
+    """Coleção com os atributos de todos os elementos em arrays (N, k) float32"""
+
+    def __init__(self, **widths):
+        self._arrays = {name: np.zeros((0, k), dtype=np.float32) for name, k in widths.items()}
+
+    def __len__(self):
+        return len(next(iter(self._arrays.values())))
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return _PointView(self, index)
+
+    def __iter__(self):
+        return (_PointView(self, i) for i in range(len(self)))
+
+    def add(self, count):
+        for name, arr in self._arrays.items():
+            self._arrays[name] = np.concatenate([arr, np.zeros((count, arr.shape[1]), np.float32)])
+
+    def remove(self, item, fast=False):
+        for name, arr in self._arrays.items():
+            self._arrays[name] = np.delete(arr, item._index, axis=0)
+
+    def foreach_get(self, attr, seq):
+        seq[:] = self._arrays[attr].ravel()
+
+    def foreach_set(self, attr, seq):
+        arr = self._arrays[attr]
+        arr[:] = np.asarray(seq, dtype=np.float32).reshape(arr.shape)
+
+
+class _IDCollection(list):
+    """Coleção de datablocks com acesso por nome e nomes únicos (.001, .002...).
+
+    Um índice por nome e por identidade mantém ``new``, ``get`` e ``link`` em
+    O(1); renomear qualquer datablock só reconstrói o índice no próximo acesso.
+    """
+
+    def __init__(self, factory=None):
+        super().__init__()
+        self._factory = factory
+        self._by_name = {}
+        self._ids = set()
+        self._suffixes = {}
+        self._renames = _renames
+
+    def _lookup(self, name):
+        if self._renames != _renames:
+            self._by_name = {item.name: item for item in self}
+            self._renames = _renames
+        return self._by_name.get(name)
+
+    def _unique(self, name):
+        if self._lookup(name) is None:
+            return name
+        # Continua do último sufixo usado para o nome, como um contador
+        i = self._suffixes.get(name, 1)
+        while self._lookup("{}.{:03d}".format(name, i)) is not None:
+            i += 1
+        self._suffixes[name] = i + 1
+        return "{}.{:03d}".format(name, i)
+
+    def _add(self, item):
+        self.append(item)
+        self._by_name[item.name] = item
+        self._ids.add(id(item))
+
+    def get(self, name, default=None):
+        item = self._lookup(name)
+        return default if item is None else item
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self.get(key)
+            if item is None:
+                raise KeyError(key)
+            return item
+        return super().__getitem__(key)
+
+    def __contains__(self, item):
+        return id(item) in self._ids
+
+    def new(self, name, *args, **kwargs):
+        item = self._factory(self._unique(name), *args, **kwargs)
+        self._add(item)
+        return item
+
+    def link(self, item):
+        if item not in self:
+            self._add(item)
+
+    def unlink(self, item):
+        super().remove(item)
+        self._ids.discard(id(item))
+        if self._by_name.get(item.name) is item:
+            del self._by_name[item.name]
+
+
+# ------------------------------------------------------------------------
+# Geometry
+# ------------------------------------------------------------------------
+
+# Contador de renomeações: invalida os índices por nome das coleções
+_renames = 0
+
+# Mudanças desde a última avaliação: datablock -> [transformação, geometria]
+_updates = {}
+
+
+def _tag(id_data, transform=False, geometry=False):
+    flags = _updates.setdefault(id_data, [False, False])
+    flags[0] |= transform
+    flags[1] |= geometry
+
+
+class ID:
+    library = None
+    is_editmode = False
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        global _renames
+        object.__setattr__(self, "_name", name)
+        _renames += 1
+
+    @property
+    def original(self):
+        return self
+
+    @property
+    def users(self):
+        return sum(1 for obj in data.objects if obj.data is self)
+
+    def update_tag(self, refresh=None):
+        _tag(self, geometry=True)
+
+    def __repr__(self):
+        return "<{} {!r}>".format(type(self).__name__, self.name)
+
+
+class Mesh(ID):
+    shape_keys = None
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.vertices = _PointCollection(co=3)
+
+    def from_pydata(self, vertices, edges, faces):
+        """Só os vértices importam para o alinhamento; arestas e faces são ignoradas"""
+        co = np.asarray(vertices, dtype=np.float32).reshape(-1, 3)
+        self.vertices = _PointCollection(co=3)
+        self.vertices.add(len(co))
+        self.vertices.foreach_set("co", co.ravel())
+
+    def update(self, calc_edges=False):
+        _tag(self, geometry=True)
+
+
+class Spline:
+    def __init__(self, type='POLY'):
+        self.type = type
+        self.bezier_points = _PointCollection(co=3, handle_left=3, handle_right=3)
+        self.points = _PointCollection(co=4, weight=1)
+
+
+class _Splines(list):
+    def new(self, type):
+        spline = Spline(type)
+        self.append(spline)
+        return spline
+
+
+class Curve(ID):
+    shape_keys = None
+
+    def __init__(self, name, type='CURVE'):
+        super().__init__(name)
+        self.type = type
+        self.splines = _Splines()
+
+
+# ------------------------------------------------------------------------
+# Animation
+# ------------------------------------------------------------------------
+
+class _Group:
+    def __init__(self, name):
+        self.name = name
+
+
+class FCurve:
+    """F-Curve com interpolação linear entre as chaves"""
+
+    def __init__(self, data_path, index=0, group=None):
+        self.data_path = data_path
+        self.array_index = index
+        self.group = group
+        self.keyframe_points = _PointCollection(co=2)
+
+    def update(self):
+        co = self.keyframe_points._arrays["co"]
+        co[:] = co[np.argsort(co[:, 0], kind="stable")]
+
+    def evaluate(self, frame):
+        co = self.keyframe_points._arrays["co"]
+        if not len(co):
+            return 0.0
+        return float(np.interp(frame, co[:, 0], co[:, 1]))
+
+
+class _FCurves(list):
+    def find(self, data_path, index=0):
+        for fc in self:
+            if fc.data_path == data_path and fc.array_index == index:
+                return fc
+        return None
+
+    def new(self, data_path, index=0, action_group=""):
+        fc = FCurve(data_path, index, _Group(action_group) if action_group else None)
+        self.append(fc)
+        return fc
+
+
+class Action(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.fcurves = _FCurves()
+
+
+class AnimData:
+    def __init__(self):
+        self.action = None
+
+
+# ------------------------------------------------------------------------
+# Objects
+# ------------------------------------------------------------------------
+
+class Object(ID):
+    """Objeto com transformação de Blender: basis = T @ R @ S, world = pai @ inversa @ basis"""
+
+    def __init__(self, name, object_data=None):
+        super().__init__(name)
+        self.data = object_data
+        if object_data is None:
+            self.type = 'EMPTY'
+        elif isinstance(object_data, Curve):
+            self.type = object_data.type
+        else:
+            self.type = 'MESH'
+        self.parent = None
+        self.matrix_parent_inverse = Matrix.Identity(4)
+        self._rotation_mode = 'XYZ'
+        self.location = (0.0, 0.0, 0.0)
+        self.rotation_euler = (0.0, 0.0, 0.0)
+        self.rotation_quaternion = (1.0, 0.0, 0.0, 0.0)
+        self.rotation_axis_angle = (0.0, 0.0, 1.0, 0.0)
+        self.scale = (1.0, 1.0, 1.0)
+        self.empty_display_type = 'PLAIN_AXES'
+        self.empty_display_size = 1.0
+        self.instance_type = 'NONE'
+        self.instance_collection = None
+        self.modifiers = []
+        self.pose = None
+        self.animation_data = None
+        self._select = False
+        self._matrix_world = self.matrix_basis
+
+    def __setattr__(self, name, value):
+        if name in ("location", "scale"):
+            value = Vector(value)
+        elif name == "rotation_euler":
+            value = Euler(value, self._rotation_mode if self._rotation_mode in _EULER_ORDERS else 'XYZ')
+        elif name == "rotation_quaternion":
+            value = Quaternion(value)
+        elif name == "rotation_axis_angle":
+            value = tuple(float(v) for v in value)
+        object.__setattr__(self, name, value)
+        if name in _TRANSFORM_ATTRS:
+            _tag(self, transform=True)
+
+    @property
+    def rotation_mode(self):
+        return self._rotation_mode
+
+    @rotation_mode.setter
+    def rotation_mode(self, mode):
+        object.__setattr__(self, "_rotation_mode", mode)
+        if mode in _EULER_ORDERS:
+            self.rotation_euler = tuple(self.rotation_euler)
+
+    def _rotation_matrix(self):
+        mode = self._rotation_mode
+        if mode == 'QUATERNION':
+            return self.rotation_quaternion.normalized().to_matrix()
+        if mode == 'AXIS_ANGLE':
+            angle, *axis = self.rotation_axis_angle
+            return Quaternion(axis, angle).to_matrix()
+        return self.rotation_euler.to_matrix()
+
+    @property
+    def matrix_basis(self):
+        return (Matrix.Translation(self.location) @ self._rotation_matrix().to_4x4()
+                @ Matrix.Diagonal(self.scale).to_4x4())
+
+    @matrix_basis.setter
+    def matrix_basis(self, matrix):
+        loc, rot, scale = Matrix(matrix).decompose()
+        self.location = loc
+        self.scale = scale
+        mode = self._rotation_mode
+        if mode == 'QUATERNION':
+            self.rotation_quaternion = rot
+        elif mode == 'AXIS_ANGLE':
+            axis, angle = rot.to_axis_angle()
+            self.rotation_axis_angle = (angle,) + tuple(axis)
+        else:
+            self.rotation_euler = rot.to_euler(mode, self.rotation_euler)
+
+    def _parent_matrix(self):
+        if self.parent is None:
+            return Matrix.Identity(4)
+        return self.parent.matrix_world @ self.matrix_parent_inverse
+
+    @property
+    def matrix_world(self):
+        """Valor da última avaliação (``view_layer.update()``) ou atribuição"""
+        return self._matrix_world
+
+    @matrix_world.setter
+    def matrix_world(self, matrix):
+        matrix = Matrix(matrix)
+        self.matrix_basis = self._parent_matrix().inverted_safe() @ matrix
+        object.__setattr__(self, "_matrix_world", matrix)
+
+    def evaluate(self):
+        object.__setattr__(self, "_matrix_world", self._parent_matrix() @ self.matrix_basis)
+
+    @property
+    def children(self):
+        return [obj for obj in data.objects if obj.parent is self]
+
+    @property
+    def users_collection(self):
+        owners = [scene.collection for scene in data.scenes] + list(data.collections)
+        return [coll for coll in owners if self in coll.objects]
+
+    @property
+    def bound_box(self):
+        co = _local_coords(self.data)
+        if co is None or not len(co):
+            return [(0.0, 0.0, 0.0)] * 8
+        lo, hi = co.min(axis=0), co.max(axis=0)
+        return [(float(x), float(y), float(z))
+                for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])]
+
+    def select_get(self, view_layer=None):
+        return self._select
+
+    def select_set(self, state, view_layer=None):
+        object.__setattr__(self, "_select", bool(state))
+
+    def animation_data_create(self):
+        if self.animation_data is None:
+            self.animation_data = AnimData()
+        return self.animation_data
+
+
+_EULER_ORDERS = {'XYZ', 'XZY', 'YXZ', 'YZX', 'ZXY', 'ZYX'}
+_TRANSFORM_ATTRS = {
+    "location", "rotation_euler", "rotation_quaternion", "rotation_axis_angle", "scale",
+    "parent", "matrix_parent_inverse",
+}
+
+
+def _local_coords(object_data):
+    if isinstance(object_data, Mesh):
+        return object_data.vertices._arrays["co"]
+    if isinstance(object_data, Curve):
+        chunks = [s.bezier_points._arrays["co"] for s in object_data.splines]
+        chunks += [s.points._arrays["co"][:, :3] for s in object_data.splines]
+        return np.concatenate(chunks) if chunks else None
+    return None
+
+
+# ------------------------------------------------------------------------
+# Scene, View Layer and Context
+# ------------------------------------------------------------------------
+
+class Collection(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.objects = _IDCollection()
+        self.children = _IDCollection()
+        self.instance_offset = Vector((0.0, 0.0, 0.0))
+
+    @property
+    def all_objects(self):
+        seen = dict.fromkeys(self.objects)
+        for child in self.children:
+            seen.update(dict.fromkeys(child.all_objects))
+        return list(seen)
+
+
+class _Cursor:
+    def __init__(self):
+        self.location = Vector((0.0, 0.0, 0.0))
+
+
+class Scene(ID):
+    def __init__(self, name):
+        super().__init__(name)
+        self.collection = Collection("Scene Collection")
+        self.cursor = _Cursor()
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+
+    @property
+    def objects(self):
+        return self.collection.all_objects
+
+
+class _LayerObjects(list):
+    def __init__(self, view_layer):
+        super().__init__(view_layer.scene.objects)
+        self._view_layer = view_layer
+
+    @property
+    def active(self):
+        return self._view_layer._active
+
+    @active.setter
+    def active(self, obj):
+        self._view_layer._active = obj
+
+    @property
+    def selected(self):
+        return [obj for obj in self if obj.select_get()]
+
+
+class ViewLayer:
+    def __init__(self, scene):
+        self.scene = scene
+        self._active = None
+
+    @property
+    def objects(self):
+        return _LayerObjects(self)
+
+    def update(self):
+        """Reavalia ``matrix_world`` de todos os objetos, pais antes dos filhos,
+        e chama os handlers de ``depsgraph_update_post`` se algo mudou"""
+        done = set()
+
+        def evaluate(obj):
+            if id(obj) in done:
+                return
+            if obj.parent is not None:
+                evaluate(obj.parent)
+            obj.evaluate()
+            done.add(id(obj))
+
+        for obj in self.scene.objects:
+            evaluate(obj)
+
+        if not _updates:
+            return
+        # Usuários de geometria editada e filhos de objetos movidos também mudam
+        for obj in self.scene.objects:
+            if obj.data is not None and _updates.get(obj.data, (False, False))[1]:
+                _tag(obj, geometry=True)
+            parent = obj.parent
+            while parent is not None:
+                if parent in _updates and _updates[parent][0]:
+                    _tag(obj, transform=True)
+                    break
+                parent = parent.parent
+        updates = [DepsgraphUpdate(id_data, *flags) for id_data, flags in _updates.items()]
+        _updates.clear()
+        depsgraph = Depsgraph(self, updates)
+        for handler in list(app.handlers.depsgraph_update_post):
+            handler(self.scene, depsgraph)
+
+
+class DepsgraphUpdate:
+    def __init__(self, id_data, is_updated_transform=False, is_updated_geometry=False):
+        self.id = id_data
+        self.is_updated_transform = is_updated_transform
+        self.is_updated_geometry = is_updated_geometry
+        self.is_updated_shading = False
+
+
+class DepsgraphObjectInstance:
+    def __init__(self, obj, matrix_world, parent=None):
+        self.object = obj
+        self.matrix_world = matrix_world
+        self.parent = parent
+        self.is_instance = parent is not None
+
+
+class Depsgraph:
+    """Só instâncias de coleção (recursivas); geometry nodes não são avaliados.
+
+    ``updates`` traz as mudanças da avaliação que chamou o handler (vazio no
+    depsgraph de ``evaluated_depsgraph_get``).
+    """
+
+    def __init__(self, view_layer, updates=()):
+        self.view_layer = view_layer
+        self.scene = view_layer.scene
+        self.updates = list(updates)
+
+    def _instances(self, instancer, matrix, top):
+        collection = instancer.instance_collection
+        offset = Matrix.Translation(-collection.instance_offset)
+        for obj in collection.all_objects:
+            mtx = matrix @ offset @ obj.matrix_world
+            yield DepsgraphObjectInstance(obj, mtx, top)
+            if obj.instance_type == 'COLLECTION' and obj.instance_collection is not None:
+                yield from self._instances(obj, mtx, top)
+
+    @property
+    def object_instances(self):
+        for obj in self.scene.objects:
+            yield DepsgraphObjectInstance(obj, obj.matrix_world)
+            if obj.instance_type == 'COLLECTION' and obj.instance_collection is not None:
+                yield from self._instances(obj, obj.matrix_world, obj)
+
+
+class Context:
+    def __init__(self, scene):
+        self.scene = scene
+        self.view_layer = ViewLayer(scene)
+        self.preferences = None
+        self.window_manager = None
+
+    @property
+    def active_object(self):
+        return self.view_layer.objects.active
+
+    object = active_object
+
+    @property
+    def selected_objects(self):
+        return self.view_layer.objects.selected
+
+    def evaluated_depsgraph_get(self):
+        return Depsgraph(self.view_layer)
+
+
+# ------------------------------------------------------------------------
+# Blend Data
+# ------------------------------------------------------------------------
+
+class BlendData:
+    filepath = ""
+
+    def __init__(self):
+        self.objects = _IDCollection(Object)
+        self.meshes = _IDCollection(Mesh)
+        self.curves = _IDCollection(Curve)
+        self.actions = _IDCollection(Action)
+        self.collections = _IDCollection(Collection)
+        self.scenes = _IDCollection(Scene)
+
+    def user_map(self, subset=None, key_types=None, value_types=None):
+        """Datablock -> objetos que o usam como ``data``"""
+        users = {key: set() for key in subset} if subset is not None else {}
+        for obj in self.objects:
+            if obj.data is not None and (subset is None or obj.data in users):
+                users.setdefault(obj.data, set()).add(obj)
+        return users
+
+
+def reset():
+    """Descarta todos os dados e cria uma cena vazia (como um arquivo novo)"""
+    global data, context
+    data = BlendData()
+    context = Context(data.scenes.new("Scene"))
+    _updates.clear()
+
+
+data = context = None
+reset()
+
+
+# ------------------------------------------------------------------------
+# bpy Submodules
+# ------------------------------------------------------------------------
+
+class _Struct:
+    """Base para as classes de operador/painel/preferências"""
+    bl_idname = ""
+
+    def report(self, type, message):
+        print("{}: {}".format(", ".join(sorted(type)), message))
+
+    def is_repeat(self):
+        return False
+
+
+def _property(**kwargs):
+    return kwargs.get("default")
+
+
+def _persistent(func):
+    return func
+
+
+def _abspath(path, start=None, library=None):
+    if path.startswith("//"):
+        base = start or os.path.dirname(data.filepath)
+        path = os.path.join(base, path[2:])
+    return os.path.normpath(os.path.abspath(path))
+
+
+def _user_resource(resource_type, path="", create=False):
+    target = os.path.join(tempfile.gettempdir(), "align_tools_standin", resource_type.lower(), path)
+    if create:
+        os.makedirs(target, exist_ok=True)
+    return target
+
+
+_timers = {}
+
+
+def _module(name, **attrs):
+    module = _types.ModuleType(name)
+    module.__dict__.update(attrs)
+    return module
+
+
+types = _module(
+    "bpy.types",
+    ID=ID, Object=Object, Mesh=Mesh, Curve=Curve, Action=Action, Collection=Collection,
+    Scene=Scene, ViewLayer=ViewLayer, Context=Context,
+    Depsgraph=Depsgraph, DepsgraphUpdate=DepsgraphUpdate,
+    DepsgraphObjectInstance=DepsgraphObjectInstance,
+    Operator=_Struct, Panel=_Struct, Menu=_Struct, AddonPreferences=_Struct, PropertyGroup=_Struct,
+)
+props = _module("bpy.props", **{
+    name: _property for name in (
+        "BoolProperty", "IntProperty", "FloatProperty", "StringProperty", "EnumProperty",
+        "BoolVectorProperty", "IntVectorProperty", "FloatVectorProperty",
+        "PointerProperty", "CollectionProperty")
+})
+app = _module(
+    "bpy.app",
+    version=(4, 2, 0),
+    background=True,
+    handlers=_module("bpy.app.handlers", persistent=_persistent, **{
+        name: [] for name in (
+            "depsgraph_update_post", "load_pre", "load_post", "save_pre", "save_post",
+            "undo_post", "redo_post", "frame_change_post")
+    }),
+    timers=_module(
+        "bpy.app.timers",
+        register=lambda func, first_interval=0.0, persistent=False: _timers.setdefault(func, first_interval),
+        unregister=lambda func: _timers.pop(func, None),
+        is_registered=lambda func: func in _timers,
+    ),
+)
+utils = _module(
+    "bpy.utils",
+    register_class=lambda cls: None,
+    unregister_class=lambda cls: None,
+    user_resource=_user_resource,
+)
+path = _module("bpy.path", abspath=_abspath)
+
+
+def install():
+    """Registra o stand-in como ``bpy`` em ``sys.modules`` (sem Blender)"""
+    module = sys.modules[__name__]
+    sys.modules.setdefault("bpy", module)
+    for name in ("types", "props", "app", "utils", "path"):
+        sys.modules.setdefault("bpy." + name, getattr(module, name))
+    sys.modules.setdefault("bpy.app.handlers", app.handlers)
+    sys.modules.setdefault("bpy.app.timers", app.timers)
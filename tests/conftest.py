@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+"""Carrega o add-on como o pacote ``align_tools`` sobre o stand-in de ``bpy``"""
+
+import importlib.util
+import pathlib
+import sys
+
+import pytest
+
+ADDON_DIR = pathlib.Path(__file__).resolve().parents[1] / "align-tools"
+
+
+def _load_addon():
+    if "align_tools" in sys.modules:
+        return sys.modules["align_tools"]
+    spec = importlib.util.spec_from_file_location(
+        "align_tools", ADDON_DIR / "__init__.py", submodule_search_locations=[str(ADDON_DIR)])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["align_tools"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_load_addon()
+
+
+@pytest.fixture
+def bpy():
+    """Cena vazia e caches limpos a cada teste"""
+    from align_tools import standin
+    from align_tools.bounds import bounds_cache
+
+    standin.reset()
+    bounds_cache.clear()
+    return standin
+
+
+def add_cube(bpy, name, location=(0.0, 0.0, 0.0), size=1.0, data=None):
+    """Cubo de lado ``2 * size`` centrado na origem local, ligado à cena"""
+    if data is None:
+        data = bpy.data.meshes.new(name)
+        data.from_pydata([(x, y, z) for x in (-size, size) for y in (-size, size)
+                          for z in (-size, size)], [], [])
+    obj = bpy.data.objects.new(name, data)
+    bpy.context.scene.collection.objects.link(obj)
+    obj.location = location
+    obj.select_set(True)
+    return obj
+
+
+def add_empty(bpy, name, location=(0.0, 0.0, 0.0)):
+    obj = bpy.data.objects.new(name, None)
+    bpy.context.scene.collection.objects.link(obj)
+    obj.location = location
+    obj.select_set(True)
+    return obj
+
+
+def animate(bpy, obj, data_path, index, keys):
+    """Chaves lineares [(frame, valor), ...] num canal de ``obj``"""
+    anim = obj.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(obj.name + "Action")
+    fc = anim.action.fcurves.new(data_path, index=index)
+    fc.keyframe_points.add(len(keys))
+    fc.keyframe_points.foreach_set("co", [v for key in keys for v in key])
+    fc.update()
+    return fc
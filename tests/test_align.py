@@ -0,0 +1,218 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import itertools
+import math
+
+from mathutils import Euler, Vector
+import numpy as np
+import pytest
+
+from align_tools.core import AlignSettings, align_objects
+
+from conftest import add_cube, add_empty
+
+
+def world_coords(obj):
+    co = obj.data.vertices._arrays["co"].astype(np.float64)
+    mtx = np.array(obj.matrix_world)
+    return co @ mtx[:3, :3].T + mtx[:3, 3]
+
+
+def world_box(obj):
+    co = world_coords(obj)
+    return co.min(axis=0), co.max(axis=0)
+
+
+def reference(lo, hi, pivot, ref):
+    return {"0": lo, "1": (lo + hi) * 0.5, "2": pivot, "3": hi}[ref]
+
+
+def selection_box(act, selected):
+    """Extents da seleção como no Align Tools original: partem do primeiro
+    vértice de um objeto não ativo e cada objeto que fica além dele substitui
+    o limite daquele lado"""
+    ref_co = world_coords(next(obj for obj in selected if obj is not act))[0]
+    lo, hi = ref_co.copy(), ref_co.copy()
+    for obj in selected:
+        box_lo, box_hi = world_box(obj)
+        lo = np.where(ref_co < box_lo, box_lo, lo)
+        hi = np.where(ref_co > box_hi, box_hi, hi)
+    return lo, hi
+
+
+@pytest.fixture
+def scene(bpy):
+    act = add_cube(bpy, "Active", location=(4.0, -2.0, 1.0), size=1.5)
+    other = add_cube(bpy, "Other", location=(-3.0, 5.0, 2.0), size=0.5)
+    third = add_cube(bpy, "Third", location=(1.0, 1.0, -4.0))
+    third.rotation_euler = (0.0, 0.0, 0.3)
+    bpy.context.view_layer.objects.active = act
+    bpy.context.scene.cursor.location = Vector((2.0, 3.0, -1.0))
+    bpy.context.view_layer.update()
+    return bpy, act, [act, other, third]
+
+
+@pytest.mark.parametrize("ref1, ref2, consistent, active_too", list(itertools.product(
+    "013", "01234", (False, True), (False, True))))
+def test_object_subject(scene, ref1, ref2, consistent, active_too):
+    bpy, act, selected = scene
+    cursor = bpy.context.scene.cursor.location
+    offset = np.array((0.25, 0.0, -0.5))
+    axes = np.array((True, False, True))
+
+    boxes = {obj: world_box(obj) for obj in selected}
+    pivots = {obj: np.array(obj.matrix_world.translation) for obj in selected}
+    initial = {obj: np.array(obj.location) for obj in selected}
+    if ref2 == "4":
+        target = np.array(cursor)
+    else:
+        target = reference(*boxes[act], pivots[act], ref2)
+
+    moved = [obj for obj in selected if obj is not act or active_too]
+    expected = dict(initial)
+    if consistent:
+        lo, hi = selection_box(act, selected)
+        delta = target - (reference(lo, hi, None, ref1) + offset)
+        for obj in moved:
+            expected[obj] = initial[obj] + np.where(axes, delta, 0.0)
+    else:
+        for obj in moved:
+            source = reference(*boxes[obj], pivots[obj], ref1) + offset
+            expected[obj] = initial[obj] + np.where(axes, target - source, 0.0)
+
+    settings = AlignSettings(loc_x=True, loc_z=True, ref1=ref1, ref2=ref2,
+                             loc_offset=tuple(offset), consistent=consistent,
+                             active_too=active_too)
+    align_objects(selected, act, settings, cursor)
+
+    for obj in selected:
+        assert np.array(obj.location) == pytest.approx(expected[obj], abs=1e-5), obj.name
+
+
+@pytest.mark.parametrize("self_or_active, ref2", list(itertools.product("12", "0123")))
+def test_cursor_subject(scene, self_or_active, ref2):
+    bpy, act, selected = scene
+    cursor = bpy.context.scene.cursor.location
+    before = np.array(cursor)
+    if self_or_active == "2":
+        lo, hi = selection_box(act, selected)
+        target = reference(lo, hi, (lo + hi) * 0.5, ref2)
+    else:
+        target = reference(*world_box(act), np.array(act.matrix_world.translation), ref2)
+
+    settings = AlignSettings(subject="2", self_or_active=self_or_active, ref2=ref2,
+                             loc_x=True, loc_y=True)
+    align_objects(selected, act, settings, cursor)
+
+    assert np.array(cursor) == pytest.approx([target[0], target[1], before[2]], abs=1e-5)
+    assert np.array(act.location) == pytest.approx((4.0, -2.0, 1.0))
+
+
+def test_cursor_reference_requires_cursor(scene):
+    bpy, act, selected = scene
+    with pytest.raises(ValueError):
+        align_objects(selected, act, AlignSettings(loc_x=True, ref2="4"))
+
+
+def test_rotation_and_scale(scene):
+    bpy, act, selected = scene
+    act.rotation_euler = (0.1, 0.2, 0.3)
+    act.scale = (2.0, 3.0, 4.0)
+    bpy.context.view_layer.update()
+    other = selected[1]
+
+    settings = AlignSettings(rot_z=True, apply_rot=True, scale_x=True, apply_scale=True)
+    align_objects(selected, act, settings)
+
+    bpy.context.view_layer.update()
+    assert other.matrix_world.to_euler('XYZ').z == pytest.approx(
+        act.matrix_world.to_euler('XYZ').z, abs=1e-5)
+    assert tuple(other.scale) == pytest.approx((2.0, 1.0, 1.0))
+
+
+def test_pivot_keeps_geometry_of_shared_data_and_children(bpy):
+    act = add_cube(bpy, "Active", location=(6.0, 0.0, 0.0))
+    owner = add_cube(bpy, "Owner", location=(0.0, 1.0, 0.0))
+    owner.rotation_euler = (0.0, 0.0, math.radians(30.0))
+    twin = add_cube(bpy, "Twin", location=(0.0, -4.0, 2.0), data=owner.data)
+    twin.scale = (2.0, 2.0, 2.0)
+    twin.select_set(False)
+    child = add_cube(bpy, "Child", location=(1.0, 0.0, 0.0))
+    child.parent = owner
+    child.select_set(False)
+    bpy.context.view_layer.objects.active = act
+    bpy.context.view_layer.update()
+
+    before = {obj: world_coords(obj) for obj in (owner, twin, child)}
+    target_x = world_box(act)[1][0]
+
+    settings = AlignSettings(subject="1", loc_x=True, ref2="3")
+    result = align_objects([owner, act], act, settings)
+    bpy.context.view_layer.update()
+
+    assert owner.matrix_world.translation.x == pytest.approx(target_x)
+    assert owner.matrix_world.translation.y == pytest.approx(1.0)
+    for obj, co in before.items():
+        assert world_coords(obj) == pytest.approx(co, abs=1e-4), obj.name
+    assert result.skipped == []
+
+
+def test_pivot_skips_geometry_it_cannot_shift(bpy):
+    act = add_cube(bpy, "Active", location=(6.0, 0.0, 0.0))
+    lattice = add_empty(bpy, "Lattice")
+    lattice.type = 'LATTICE'
+    empty = add_empty(bpy, "Empty")
+    bpy.context.view_layer.objects.active = act
+    bpy.context.view_layer.update()
+
+    result = align_objects([lattice, empty, act], act,
+                           AlignSettings(subject="1", loc_x=True, ref2="2"))
+
+    assert result.skipped == [lattice]
+    assert tuple(lattice.location) == (0.0, 0.0, 0.0)
+    assert tuple(empty.location) == pytest.approx((6.0, 0.0, 0.0))
+
+
+def test_snap_parent_and_child_on_grid(bpy):
+    act = add_cube(bpy, "Active", location=(0.0, 0.0, 0.0))
+    parent = add_empty(bpy, "Asm", location=(0.13, 0.27, 0.0))
+    parent.rotation_euler = Euler((0.0, 0.0, math.radians(20.0)))
+    child = add_empty(bpy, "Part", location=(1.04, 0.06, 0.0))
+    child.parent = parent
+    bpy.context.view_layer.objects.active = act
+    bpy.context.view_layer.update()
+
+    settings = AlignSettings(snap=True, snap_location=0.1, snap_reference="2")
+    align_objects([act, parent, child], act, settings)
+    bpy.context.view_layer.update()
+
+    for obj in (parent, child):
+        co = np.array(obj.matrix_world.translation)[:2]
+        assert co == pytest.approx(np.round(co / 0.1) * 0.1, abs=1e-5), obj.name
+
+
+def test_depsgraph_handler_invalidates_edited_geometry(bpy):
+    import align_tools
+
+    act = add_cube(bpy, "Active", location=(-3.0, 0.0, 0.0))
+    box = add_cube(bpy, "Box", location=(4.0, 0.0, 0.0))
+    bpy.context.view_layer.objects.active = act
+    bpy.context.view_layer.update()
+    settings = AlignSettings(loc_x=True, ref1="0", ref2="0")
+    align_objects([act, box], act, settings)
+    assert box.location.x == pytest.approx(-3.0)
+
+    bpy.app.handlers.depsgraph_update_post.append(align_tools.bounds_depsgraph_update)
+    try:
+        co = box.data.vertices._arrays["co"].ravel().copy()
+        co[0::3] += 10.0
+        box.data.vertices.foreach_set("co", co)
+        box.data.update()
+        bpy.context.view_layer.update()
+
+        align_objects([act, box], act, settings)
+    finally:
+        bpy.app.handlers.depsgraph_update_post.remove(align_tools.bounds_depsgraph_update)
+    assert box.location.x == pytest.approx(-13.0)
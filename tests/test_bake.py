@@ -0,0 +1,53 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import math
+
+from mathutils import Euler, Vector
+import pytest
+
+from align_tools.bake import bake_alignment
+from align_tools.core import AlignSettings
+
+from conftest import add_cube, add_empty, animate
+
+
+def test_bake_follows_animated_empty(bpy):
+    platform = add_empty(bpy, "Platform")
+    animate(bpy, platform, "location", 0, [(1.0, 0.0), (11.0, 10.0)])
+    box = add_cube(bpy, "Box", location=(3.0, 2.0, 0.0))
+    bpy.context.view_layer.update()
+
+    settings = AlignSettings(loc_x=True, ref1="1", ref2="1")
+    bake = bake_alignment([box, platform], platform, settings, 1, 11)
+
+    assert bake.objects == [box]
+    action = box.animation_data.action
+    assert action.fcurves.find("location", index=1) is None
+    fc = action.fcurves.find("location", index=0)
+    for frame in (1.0, 6.0, 11.0):
+        assert fc.evaluate(frame) == pytest.approx(frame - 1.0)
+
+
+def test_bake_parented_child_under_rotated_parent(bpy):
+    target = add_cube(bpy, "Target", location=(9.0, 0.0, 0.0))
+    animate(bpy, target, "location", 1, [(1.0, 0.0), (5.0, 4.0)])
+    parent = add_empty(bpy, "Parent", location=(1.0, 2.0, 0.0))
+    parent.select_set(False)
+    parent.rotation_euler = Euler((0.0, 0.0, math.radians(45.0)))
+    child = add_cube(bpy, "Child", location=(2.0, 1.0, 0.5))
+    child.parent = parent
+    bpy.context.view_layer.objects.active = target
+    bpy.context.view_layer.update()
+    world_y = child.matrix_world.translation.y
+
+    settings = AlignSettings(loc_x=True, ref1="2", ref2="2")
+    bake_alignment([child, target], target, settings, 1, 5)
+
+    action = child.animation_data.action
+    for frame in (1.0, 3.0, 5.0):
+        location = Vector([action.fcurves.find("location", index=i).evaluate(frame)
+                           for i in range(3)])
+        world = parent.matrix_world @ child.matrix_parent_inverse @ location
+        assert tuple(world) == pytest.approx((9.0, world_y, 0.5), abs=1e-4)
@@ -0,0 +1,63 @@
+# SPDX-FileCopyrightText: 2009-2010 gabhead, Lell, Anfeo.
+#
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+import itertools
+
+from mathutils import Vector
+import numpy as np
+import pytest
+
+from align_tools.layout import arrange_grid, stack_objects
+
+from conftest import add_cube
+
+
+def boxes(bpy, objects):
+    bpy.context.view_layer.update()
+    result = []
+    for obj in objects:
+        co = obj.data.vertices._arrays["co"].astype(np.float64)
+        mtx = np.array(obj.matrix_world)
+        co = co @ mtx[:3, :3].T + mtx[:3, 3]
+        result.append((co.min(axis=0), co.max(axis=0)))
+    return result
+
+
+@pytest.mark.parametrize("axis, sign", [("X", 1.0), ("-Z", -1.0)])
+def test_stack_end_to_end(bpy, axis, sign):
+    a = "XYZ".index(axis[-1])
+    objects = [add_cube(bpy, "Cube", location=(i * 0.7, -i, i * 0.3), size=0.5 + 0.25 * i)
+               for i in range(4)]
+    bpy.context.view_layer.update()
+    base = np.array(objects[1].location)
+
+    stack_objects(objects, objects[1], axis, gap=0.5)
+
+    assert np.array(objects[1].location) == pytest.approx(base)
+    extents = boxes(bpy, objects)
+    rest = [i for i in range(len(objects)) if i != 1]
+    chain = [1] + sorted(rest, key=lambda i: sign * extents[i][0][a])
+    for prev, cur in zip(chain, chain[1:]):
+        if sign > 0:
+            gap = extents[cur][0][a] - extents[prev][1][a]
+        else:
+            gap = extents[prev][0][a] - extents[cur][1][a]
+        assert gap == pytest.approx(0.5, abs=1e-5)
+
+
+def test_arrange_grid_packs_without_overlap(bpy):
+    objects = [add_cube(bpy, "Cube", location=(i, 2.0 * i, -i), size=0.3 + 0.2 * (i % 3))
+               for i in range(7)]
+    bpy.context.view_layer.update()
+    origin = Vector((1.0, -2.0, 0.5))
+
+    arrange_grid(objects, origin, "XY", padding=0.1)
+
+    extents = boxes(bpy, objects)
+    for lo, hi in extents:
+        assert lo[2] == pytest.approx(origin.z, abs=1e-5)
+        assert lo[0] >= origin.x - 1e-5 and lo[1] >= origin.y - 1e-5
+    for (lo1, hi1), (lo2, hi2) in itertools.combinations(extents, 2):
+        apart = (hi1[:2] + 0.1 <= lo2[:2] + 1e-5) | (hi2[:2] + 0.1 <= lo1[:2] + 1e-5)
+        assert apart.any()